@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Tuple
+
+import servidor
+
+Conexion = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class Estadisticas:
+    def __init__(self):
+        self.partidas = 0
+        self.jugadas = 0
+        self.errores = 0
+        self.resultados = {}
+        self.demoras: List[float] = []
+        self.duracion = 0.0
+
+
+async def _conectar(host: str, puerto: int, unix: str) -> Conexion:
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, puerto)
+
+
+async def _enviar(escritor: asyncio.StreamWriter, linea: str) -> None:
+    escritor.write((linea + '\n').encode())
+    await escritor.drain()
+
+
+async def _leer(lector: asyncio.StreamReader) -> List[str]:
+    linea = await lector.readline()
+    if not linea:
+        raise ConnectionError('el servidor cerro la conexion')
+    return linea.decode().split()
+
+
+async def _jugador(conexion: Conexion, simbolo: str, generador: random.Random, estadisticas: Estadisticas) -> str:
+    """Juega al azar hasta que termina la partida y devuelve el resultado.
+    Cada jugada se envía al recibir el tablero con el aviso de su turno, y la
+    demora es el tiempo hasta recibir el tablero actualizado."""
+    lector, escritor = conexion
+    tablero = None
+    enviada = None
+    while True:
+        palabras = await _leer(lector)
+        if palabras[0] == 'TABLERO':
+            tablero = palabras[1]
+            if enviada is not None:
+                estadisticas.demoras.append(time.perf_counter() - enviada)
+                enviada = None
+        elif palabras[0] == 'FIN':
+            return palabras[1]
+        elif palabras[0] == 'ERROR':
+            estadisticas.errores += 1
+        elif palabras[0] == 'TURNO' and palabras[1] == simbolo:
+            fila_superior = tablero.split('/')[0]
+            libres = [c for c, celda in enumerate(fila_superior) if celda == '.']
+            enviada = time.perf_counter()
+            await _enviar(escritor, f'JUGAR {generador.choice(libres)}')
+            estadisticas.jugadas += 1
+
+
+async def jugar_partidas(host: str, puerto: int, unix: str, n_filas: int, n_columnas: int, partidas: int,
+                         semilla: int, estadisticas: Estadisticas) -> None:
+    """Abre dos conexiones y juega `partidas` partidas seguidas entre ellas."""
+    generador = random.Random(semilla)
+    conexion_x = await _conectar(host, puerto, unix)
+    conexion_o = await _conectar(host, puerto, unix)
+    try:
+        for _ in range(partidas):
+            await _enviar(conexion_x[1], f'NUEVA {n_filas} {n_columnas}')
+            _, identificador, _ = await _leer(conexion_x[0])
+            await _enviar(conexion_o[1], f'UNIRSE {identificador}')
+            resultado, _ = await asyncio.gather(
+                _jugador(conexion_x, 'X', generador, estadisticas),
+                _jugador(conexion_o, 'O', generador, estadisticas),
+            )
+            estadisticas.partidas += 1
+            estadisticas.resultados[resultado] = estadisticas.resultados.get(resultado, 0) + 1
+    finally:
+        for _, escritor in (conexion_x, conexion_o):
+            escritor.close()
+
+
+async def probar_carga(args) -> Estadisticas:
+    estadisticas = Estadisticas()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        jugar_partidas(args.host, args.puerto, args.unix, args.filas, args.columnas, args.partidas,
+                       args.semilla + i, estadisticas)
+        for i in range(args.pares)
+    ))
+    estadisticas.duracion = time.perf_counter() - inicio
+    return estadisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga para servidor.py: muchos pares de jugadores al azar.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=servidor.PUERTO)
+    parser.add_argument('--unix', help='ruta del socket Unix del servidor')
+    parser.add_argument('--pares', type=int, default=500, help='pares de conexiones simultaneas')
+    parser.add_argument('--partidas', type=int, default=5, help='partidas por par')
+    parser.add_argument('--filas', type=int, default=6)
+    parser.add_argument('--columnas', type=int, default=7)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    estadisticas = asyncio.run(probar_carga(args))
+    duracion = estadisticas.duracion
+    demoras = sorted(estadisticas.demoras)
+    print(f'{args.pares * 2} conexiones, {estadisticas.partidas} partidas en {duracion:.2f} s')
+    print(f'{estadisticas.partidas / duracion:.1f} partidas/s, {estadisticas.jugadas / duracion:.0f} jugadas/s, '
+          f'{estadisticas.errores} errores')
+    if demoras:
+        print(f'Demora por jugada: mediana {demoras[len(demoras) // 2] * 1000:.2f} ms, '
+              f'p99 {demoras[int(len(demoras) * 0.99)] * 1000:.2f} ms')
+    print('Resultados:', ', '.join(f'{r}: {n}' for r, n in sorted(estadisticas.resultados.items())))
+
+
+if __name__ == '__main__':
+    main()
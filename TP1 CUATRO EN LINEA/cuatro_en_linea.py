@@ -1,12 +1,225 @@
-from typing import List
+import functools
+import sys
+from typing import List, Tuple
 
 SIMBOLO_O = 'o'
 SIMBOLO_X = 'x'
 
 
-def crear_tablero(n_filas: int, n_columnas: int) -> List[List[str]]:
+class TableroBits:
+    """Tablero de cuatro en línea representado con dos máscaras de bits (una
+    por símbolo) y la altura ocupada de cada columna.
+
+    Cada columna ocupa `alto + 1` bits consecutivos de la máscara, indexados
+    desde la fila inferior. El bit extra de cada columna queda siempre vacío
+    y evita que una línea "salte" de una columna a la siguiente al desplazar
+    la máscara, de modo que los cuatro en línea se detectan con operaciones
+    de desplazamiento y AND.
+
+    Además lleva la cuenta de los símbolos insertados y mantiene la grilla
+    de celdas como lista de listas (atributo `grilla`, de sólo lectura para
+    quien use el tablero). Así el turno, si una columna está llena y si el
+    tablero está completo se responden en tiempo constante, y el tablero se
+    puede indexar como una lista de listas (`tablero[f][c]`), por lo que las
+    funciones del módulo lo aceptan igual que a un tablero creado como lista.
+    Al indexarlo se obtiene cada fila como tupla, para que asignar una celda
+    (`tablero[f][c] = 'X'`) falle en lugar de desincronizar la grilla de las
+    máscaras.
+
+    Las columnas jugadas se apilan en `jugadas`, y las deshechas en
+    `deshechas`, para deshacer y rehacer jugadas en tiempo constante sin
+    copiar el tablero.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int):
+        """Crea un tablero vacío de n_filas por n_columnas."""
+        self.alto = n_filas
+        self.ancho = n_columnas
+        self.bits_x = 0
+        self.bits_o = 0
+        self.alturas = [0] * n_columnas
+        self.movimientos = 0
+        self.grilla = [[' '] * n_columnas for _ in range(n_filas)]
+        self._filas = [None] * n_filas
+        self.ultima_jugada = None
+        self.jugadas = []
+        self.deshechas = []
+
+    @classmethod
+    def desde_lista(cls, tablero: List[List[str]]) -> 'TableroBits':
+        """Dado un tablero creado como lista de listas, devuelve el
+        `TableroBits` equivalente. Como no se sabe en qué orden se jugaron
+        los símbolos que ya tiene, no se pueden deshacer."""
+        alto = len(tablero)
+        ancho = len(tablero[0])
+        bits = cls(alto, ancho)
+        for c in range(ancho):
+            for f in range(alto - 1, -1, -1):
+                simbolo = tablero[f][c]
+                if simbolo == ' ':
+                    break
+                bit = bits._bit(f, c)
+                if simbolo == 'X':
+                    bits.bits_x |= bit
+                else:
+                    bits.bits_o |= bit
+                bits.alturas[c] += 1
+                bits.movimientos += 1
+                bits.grilla[f][c] = simbolo
+        return bits
+
+    def copiar(self) -> 'TableroBits':
+        """Devuelve un tablero independiente con el mismo contenido."""
+        copia = TableroBits.__new__(TableroBits)
+        copia.alto = self.alto
+        copia.ancho = self.ancho
+        copia.bits_x = self.bits_x
+        copia.bits_o = self.bits_o
+        copia.alturas = self.alturas[:]
+        copia.movimientos = self.movimientos
+        copia.grilla = [fila[:] for fila in self.grilla]
+        copia._filas = self._filas[:]
+        copia.ultima_jugada = self.ultima_jugada
+        copia.jugadas = self.jugadas[:]
+        copia.deshechas = self.deshechas[:]
+        return copia
+
+    def a_lista(self) -> List[List[str]]:
+        """Devuelve el tablero en el formato de lista de listas de
+        `crear_tablero`."""
+        return [fila[:] for fila in self.grilla]
+
+    def _bit(self, fila: int, columna: int) -> int:
+        """Devuelve la máscara con un único bit encendido en la posición de la
+        celda (fila, columna), con la fila indexada desde arriba."""
+        return 1 << (columna * (self.alto + 1) + self.alto - 1 - fila)
+
+    def celda(self, fila: int, columna: int) -> str:
+        """Devuelve el símbolo de la celda (fila, columna): 'X', 'O' o ' '."""
+        return self.grilla[fila][columna]
+
+    def es_turno_de_x(self) -> bool:
+        """Devuelve True si el próximo símbolo a insertar es X."""
+        return self.movimientos % 2 == 0
+
+    def columna_llena(self, columna: int) -> bool:
+        """Devuelve True si la columna no admite más símbolos."""
+        return self.alturas[columna] == self.alto
+
+    def insertar(self, columna: int) -> bool:
+        """Inserta el símbolo del turno actual en la columna indicada.
+        Devuelve False si la columna es inválida o está llena. Una jugada
+        nueva descarta las jugadas deshechas."""
+        if columna < 0 or columna >= self.ancho or self.alturas[columna] == self.alto:
+            return False
+        self._colocar(columna)
+        if self.deshechas:
+            self.deshechas.clear()
+        return True
+
+    def deshacer(self) -> bool:
+        """Quita el último símbolo insertado y lo apila para rehacerlo.
+        Devuelve False si no hay jugadas para deshacer."""
+        if not self.jugadas:
+            return False
+        columna = self.jugadas.pop()
+        altura = self.alturas[columna] - 1
+        bit = 1 << (columna * (self.alto + 1) + altura)
+        self.bits_x &= ~bit
+        self.bits_o &= ~bit
+        self.grilla[self.alto - 1 - altura][columna] = ' '
+        self._filas[self.alto - 1 - altura] = None
+        self.alturas[columna] = altura
+        self.movimientos -= 1
+        self.deshechas.append(columna)
+        if self.jugadas:
+            anterior = self.jugadas[-1]
+            self.ultima_jugada = (self.alto - self.alturas[anterior], anterior)
+        else:
+            self.ultima_jugada = None
+        return True
+
+    def rehacer(self) -> bool:
+        """Vuelve a insertar el último símbolo deshecho. Devuelve False si
+        no hay jugadas para rehacer."""
+        if not self.deshechas:
+            return False
+        self._colocar(self.deshechas.pop())
+        return True
+
+    def _colocar(self, columna: int) -> None:
+        """Inserta el símbolo del turno actual en una columna con lugar."""
+        altura = self.alturas[columna]
+        bit = 1 << (columna * (self.alto + 1) + altura)
+        fila = self.alto - 1 - altura
+        if self.movimientos % 2 == 0:
+            self.bits_x |= bit
+            self.grilla[fila][columna] = 'X'
+        else:
+            self.bits_o |= bit
+            self.grilla[fila][columna] = 'O'
+        self._filas[fila] = None
+        self.alturas[columna] = altura + 1
+        self.movimientos += 1
+        self.ultima_jugada = (fila, columna)
+        self.jugadas.append(columna)
+
+    def completo(self) -> bool:
+        """Devuelve True si no queda espacio en ninguna columna."""
+        return self.movimientos == self.alto * self.ancho
+
+    def ganador_desde(self, fila: int, columna: int) -> str:
+        """Devuelve el símbolo de la celda si forma un cuatro en línea, o ' '
+        si no. Revisa sólo la máscara de ese símbolo."""
+        simbolo = self.grilla[fila][columna]
+        mascara = self.bits_x if simbolo == 'X' else self.bits_o
+        if simbolo != ' ' and hay_cuatro_en_linea(mascara, self.alto):
+            return simbolo
+        return ' '
+
+    def ganador(self) -> str:
+        """Devuelve el símbolo con un cuatro en línea, o ' ' si no hay."""
+        if hay_cuatro_en_linea(self.bits_x, self.alto):
+            return 'X'
+        if hay_cuatro_en_linea(self.bits_o, self.alto):
+            return 'O'
+        return ' '
+
+    def __len__(self) -> int:
+        return self.alto
+
+    def __getitem__(self, fila: int) -> Tuple[str, ...]:
+        # Las tuplas de las filas se arman al pedirlas y se descartan cuando
+        # la fila cambia.
+        tupla = self._filas[fila]
+        if tupla is None:
+            tupla = self._filas[fila] = tuple(self.grilla[fila])
+        return tupla
+
+    def __repr__(self) -> str:
+        return f'TableroBits({self.a_lista()!r})'
+
+
+def hay_cuatro_en_linea(mascara: int, alto: int) -> bool:
+    """Dada la máscara de bits de un símbolo en un `TableroBits` de `alto`
+    filas, devuelve True si contiene cuatro bits alineados en vertical,
+    horizontal o en alguna de las dos diagonales."""
+    for desplazamiento in (1, alto + 1, alto, alto + 2):
+        pares = mascara & (mascara >> desplazamiento)
+        if pares & (pares >> (2 * desplazamiento)):
+            return True
+    return False
+
+
+def crear_tablero(n_filas: int, n_columnas: int, bits: bool = False) -> List[List[str]]:
     """Crea un nuevo tablero de cuatro en línea, con dimensiones
     n_filas por n_columnas.
+    Si `bits` es True, el tablero se representa internamente con un
+    `TableroBits`, que se puede indexar igual que la lista de listas y es
+    aceptado por todas las funciones del módulo. Las funciones del módulo
+    también aceptan cualquier otro tablero que no sea una lista y tenga los
+    mismos métodos que `TableroBits` (por ejemplo,
+    `tablero_disperso.TableroDisperso`).
     Para todo el módulo `cuatro_en_linea`, las cadenas reconocidas para los
     valores de la lista de listas son las siguientes:
         - Celda vacía: ' '
@@ -30,6 +243,8 @@ def crear_tablero(n_filas: int, n_columnas: int) -> List[List[str]]:
             [' ', ' ', ' ', ' ', ' ']
         ]
     """
+    if bits:
+        return TableroBits(n_filas, n_columnas)
     tablero = []
     for f in range(n_filas):
         fila = []
@@ -55,6 +270,8 @@ def es_turno_de_x(tablero: List[List[str]]) -> bool:
         - el parámetro `tablero` fue inicializado con la función `crear_tablero`
         - los símbolos del tablero fueron insertados previamente insertados con
           la función `insertar_simbolo`"""
+    if not isinstance(tablero, list):
+        return tablero.es_turno_de_x()
     n_filas = len(tablero)
     n_columnas = len(tablero[0])
     cont_x = 0
@@ -82,20 +299,60 @@ def insertar_simbolo(tablero: List[List[str]], columna: int) -> bool:
         - si la función devolvió `True`, se modificó el contenido del parámetro
           `tablero`. Caso contrario, el parámetro `tablero` no se vio modificado
     """
+    return insertar_simbolo_en_fila(tablero, columna) is not None
+
+
+def insertar_simbolo_en_fila(tablero: List[List[str]], columna: int) -> int:
+    """Igual que `insertar_simbolo`, pero devuelve la fila en la que quedó el
+    símbolo insertado, o None si no se pudo insertar. Junto con la columna,
+    es la posición que necesita `obtener_ganador_desde`.
+    En un `TableroBits` la posición también queda registrada en su atributo
+    `ultima_jugada`."""
+    if not isinstance(tablero, list):
+        if not tablero.insertar(columna):
+            return None
+        return tablero.ultima_jugada[0]
     ancho = len(tablero[0])
     c = columna
     if c < 0 or c >= ancho:
-        return False
+        return None
     for f in range(len(tablero)-1 ,-1, -1):
             if tablero[f][c] == ' ':
                 if es_turno_de_x(tablero):
                     tablero[f][c] = 'X'
                 else:
                     tablero[f][c] = 'O'
-                return True
-    return False
+                return f
+    return None
     
 
+def deshacer_simbolo(tablero: List[List[str]]) -> bool:
+    """Dado un tablero, quita el último símbolo insertado, con lo que el
+    turno vuelve a ser de quien lo insertó. Devuelve False si no hay
+    jugadas para deshacer. Sólo se guardan las columnas jugadas, y deshacer
+    lleva tiempo constante.
+
+    PRECONDICIONES:
+        - el parámetro `tablero` fue creado con `crear_tablero(..., bits=True)`
+    """
+    if isinstance(tablero, list):
+        raise TypeError('deshacer_simbolo necesita un tablero creado con bits=True')
+    return tablero.deshacer()
+
+
+def rehacer_simbolo(tablero: List[List[str]]) -> bool:
+    """Dado un tablero, vuelve a insertar el último símbolo quitado con
+    `deshacer_simbolo`. Devuelve False si no hay jugadas para rehacer; las
+    jugadas deshechas se descartan al insertar un símbolo nuevo.
+
+    PRECONDICIONES:
+        - el parámetro `tablero` fue creado con `crear_tablero(..., bits=True)`
+    """
+    if isinstance(tablero, list):
+        raise TypeError('rehacer_simbolo necesita un tablero creado con bits=True')
+    return tablero.rehacer()
+
+
 def tablero_completo(tablero: List[List[str]]) -> bool:
     """Dado un tablero, indica si se encuentra completo. Un tablero se considera
     completo cuando no hay más espacio para insertar un nuevo símbolo, en tal
@@ -104,6 +361,8 @@ def tablero_completo(tablero: List[List[str]]) -> bool:
     PRECONDICIONES:
         - el parámetro `tablero` fue inicializado con la función `crear_tablero`
     """
+    if not isinstance(tablero, list):
+        return tablero.completo()
     ancho = len(tablero[0])
     alto = len(tablero)
     for f in range(alto):
@@ -113,6 +372,19 @@ def tablero_completo(tablero: List[List[str]]) -> bool:
     return True
 
 
+def columna_llena(tablero: List[List[str]], columna: int) -> bool:
+    """Dado un tablero y un índice de columna válido, indica si dicha columna
+    ya no tiene espacio para insertar un nuevo símbolo.
+
+    PRECONDICIONES:
+        - el parámetro `tablero` fue inicializado con la función `crear_tablero`
+        - 0 <= columna < ancho del tablero
+    """
+    if not isinstance(tablero, list):
+        return tablero.columna_llena(columna)
+    return tablero[0][columna] != ' '
+
+
 def obtener_ganador(tablero: List[List[str]]) -> str:
     """Dado un tablero, devuelve el símbolo que ganó el juego.
     El símbolo ganador estará dado por aquel que tenga un cuatro en línea. Es
@@ -136,6 +408,8 @@ def obtener_ganador(tablero: List[List[str]]) -> str:
             [' ', 'O', 'O', 'X', 'X', 'X', 'O'],
         ]
     """
+    if not isinstance(tablero, list):
+        return tablero.ganador()
     ganador_horizontal = verificar_ganador_horizontal(tablero)
     if not ganador_horizontal == ' ':
         return ganador_horizontal
@@ -151,73 +425,110 @@ def obtener_ganador(tablero: List[List[str]]) -> str:
     return ' '
     
 
+def obtener_ganador_desde(tablero: List[List[str]], fila: int, columna: int) -> str:
+    """Dado un tablero y la posición del último símbolo insertado, devuelve
+    dicho símbolo si forma un cuatro en línea, o el símbolo vacío si no.
+    Como sólo el último símbolo puede haber completado una línea nueva, basta
+    con revisar las cuatro líneas que pasan por esa celda, sin recorrer todo
+    el tablero.
+
+    PRECONDICIONES:
+        - el parámetro `tablero` fue inicializado con la función `crear_tablero`
+        - (fila, columna) es una celda ocupada, por ejemplo la devuelta por
+          `insertar_simbolo_en_fila`
+    """
+    if not isinstance(tablero, list):
+        return tablero.ganador_desde(fila, columna)
+    if tablero[fila][columna] == ' ':
+        return ' '
+    return _ganador_en_ventanas(tablero, ventanas_por_celda(len(tablero), len(tablero[0]))[fila][columna])
+
+
 # Chequear ganador en todas direcciones    
 
         
+Ventana = Tuple[Tuple[int, int], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def ventanas_por_direccion(n_filas: int, n_columnas: int) -> Tuple[Tuple[Ventana, ...], ...]:
+    """Dadas las dimensiones de un tablero, devuelve todas las ventanas de
+    cuatro celdas alineadas donde se puede formar un cuatro en línea, como
+    tuplas de posiciones (fila, columna). Se agrupan por dirección
+    (horizontal, vertical, diagonal y diagonal inversa) y cada grupo está en
+    el orden en que lo recorre su función `verificar_ganador_*`.
+    El resultado se calcula una sola vez por tamaño de tablero."""
+    horizontales = tuple(
+        tuple((f, c + i) for i in range(4))
+        for c in range(n_columnas - 3) for f in range(n_filas)
+    )
+    verticales = tuple(
+        tuple((f + i, c) for i in range(4))
+        for c in range(n_columnas) for f in range(n_filas - 3)
+    )
+    diagonales = tuple(
+        tuple((f + i, c + i) for i in range(4))
+        for f in range(n_filas - 3) for c in range(n_columnas - 3)
+    )
+    diagonales_inversas = tuple(
+        tuple((f + i, c - i) for i in range(4))
+        for f in range(n_filas - 3) for c in range(3, n_columnas)
+    )
+    return horizontales, verticales, diagonales, diagonales_inversas
+
+
+@functools.lru_cache(maxsize=None)
+def ventanas_ganadoras(n_filas: int, n_columnas: int) -> Tuple[Ventana, ...]:
+    """Devuelve todas las ventanas de `ventanas_por_direccion` en una sola
+    tupla. Es la tabla que comparten la detección de ganador y las funciones
+    de evaluación de la IA."""
+    ventanas = ()
+    for direccion in ventanas_por_direccion(n_filas, n_columnas):
+        ventanas += direccion
+    return ventanas
+
+
+@functools.lru_cache(maxsize=None)
+def ventanas_por_celda(n_filas: int, n_columnas: int) -> Tuple[Tuple[Tuple[Ventana, ...], ...], ...]:
+    """Devuelve el índice inverso de `ventanas_ganadoras`: en la posición
+    [fila][columna] están las ventanas que contienen a esa celda."""
+    por_celda = [[[] for c in range(n_columnas)] for f in range(n_filas)]
+    for ventana in ventanas_ganadoras(n_filas, n_columnas):
+        for f, c in ventana:
+            por_celda[f][c].append(ventana)
+    return tuple(tuple(tuple(ventanas) for ventanas in fila) for fila in por_celda)
+
+
+def _ganador_en_ventanas(tablero: List[List[str]], ventanas: Tuple[Ventana, ...]) -> str:
+    """Devuelve el símbolo de la primera ventana completa de un mismo
+    símbolo, o el símbolo vacío si no hay."""
+    for (f1, c1), (f2, c2), (f3, c3), (f4, c4) in ventanas:
+        simbolo = tablero[f1][c1]
+        if not simbolo == ' ' and simbolo == tablero[f2][c2] == tablero[f3][c3] == tablero[f4][c4]:
+            return simbolo
+    return ' '
+
+
 def verificar_ganador_horizontal(tablero: List[List[str]]) -> str:
     """Dado un tablero, verifica si hay un ganador en direcciones horizontales. 
     En tal caso, la función devuelve el símbolo ganador, si no hay ganador, 
     la función devuelve un espacio vacío."""
-    alto = len(tablero)
-    ancho = len(tablero[0])
-    for c in range(ancho):
-        for f in range(alto):
-            if c + 3 < ancho:
-                simbolo_1 = tablero[f][c]
-                simbolo_2 = tablero[f][c + 1]
-                simbolo_3 = tablero[f][c + 2]
-                simbolo_4 = tablero[f][c + 3]
-                if not simbolo_1 == ' ' and simbolo_1 == simbolo_2 == simbolo_3 == simbolo_4:
-                    return simbolo_1
-    return ' '
+    return _ganador_en_ventanas(tablero, ventanas_por_direccion(len(tablero), len(tablero[0]))[0])
 
 
 def verificar_ganador_vertical(tablero:List[List[str]]) -> str:
     """Dado un tablero, verifica si hay un ganador en direcciones verticales. En tal caso la funcion devuelve el simbolo ganador, si no hay ganador la funcion devuelve un espacio vacio."""
-    alto = len(tablero)
-    ancho = len(tablero[0])
-    for c in range(ancho):
-        for f in range(alto):
-            if f + 3 < alto:
-                simbolo_1 = tablero[f][c]
-                simbolo_2 = tablero[f + 1][c]
-                simbolo_3 = tablero[f + 2][c]
-                simbolo_4 = tablero[f + 3][c]
-                if not simbolo_1 == ' ' and simbolo_1 == simbolo_2 == simbolo_3 == simbolo_4:
-                    return simbolo_1
-    return ' '
+    return _ganador_en_ventanas(tablero, ventanas_por_direccion(len(tablero), len(tablero[0]))[1])
 
 
 def verificar_ganador_diagonal(tablero:List[List[str]]) -> str:
     """Dado un tablero, verifica si hay un ganador en direcciones diagonales. En tal caso la funcion devuelve el simbolo ganador, si no hay ganador la funcion devuelve un espacio vacio."""
-    alto = len(tablero)
-    ancho = len(tablero[0])
-    for f in range(alto):
-        for c in range(ancho):
-            if c + 3 < ancho and f + 3 < alto:
-                simbolo_1 = tablero[f][c]
-                simbolo_2 = tablero[f + 1][c + 1]
-                simbolo_3 = tablero[f + 2][c + 2]
-                simbolo_4 = tablero[f + 3][c + 3]
-                if not simbolo_1 == ' ' and simbolo_1 == simbolo_2 == simbolo_3 == simbolo_4:
-                    return simbolo_1
-    return ' '
+    return _ganador_en_ventanas(tablero, ventanas_por_direccion(len(tablero), len(tablero[0]))[2])
 
 
 def verificar_ganador_diagonal_inversa(tablero:List[List[str]]) -> str:
     """Dado un tablero, verifica si hay un ganador en direcciones diagonales inversas. En tal caso la funcion devuelve el simbolo ganador, si no hay ganador la funcion devuelve un espacio vacio."""
-    alto = len(tablero)
-    ancho = len(tablero[0])
-    for f in range(alto - 3):
-        for c in range(3, ancho):
-            if c - 3 >= 0:
-                simbolo_1 = tablero[f][c]
-                simbolo_2 = tablero[f + 1][c - 1]
-                simbolo_3 = tablero[f + 2][c - 2]
-                simbolo_4 = tablero[f + 3][c - 3]
-                if not simbolo_1 == ' ' and simbolo_1 == simbolo_2 == simbolo_3 == simbolo_4:
-                    return simbolo_1
-    return ' '
+    return _ganador_en_ventanas(tablero, ventanas_por_direccion(len(tablero), len(tablero[0]))[3])
 
 
 # Validaciones Usuario
@@ -238,6 +549,31 @@ def dimensiones_tablero() -> int|int:
     return ancho, alto
     
 
+def elegir_oponente(dificultades: List[str]) -> str:
+    """La funcion pregunta si se juega contra otra persona o contra la
+    computadora. Devuelve None para dos jugadores, o la dificultad elegida
+    de entre las recibidas por parametro."""
+    print('0. Dos jugadores')
+    for i, dificultad in enumerate(dificultades):
+        print(f'{i + 1}. Contra la computadora ({dificultad})')
+    while True:
+        opcion = input('Seleccione un modo de juego: ')
+        if opcion.isdigit() and 0 <= int(opcion) <= len(dificultades):
+            break
+    if opcion == '0':
+        return None
+    return dificultades[int(opcion) - 1]
+
+
+def elegir_pistas() -> bool:
+    """La funcion pregunta si se quieren pistas durante la partida. Devuelve
+    True si la respuesta es 's'."""
+    while True:
+        opcion = input('Mostrar pistas y pensar durante su turno? (s/n): ')
+        if opcion in ('s', 'n'):
+            return opcion == 's'
+
+
 def validar_ancho_alto(dimension:int) -> bool:
     """La funcion valida que la dimension que recibe por parametro se encuentre dentro del limite permitido."""
     return 4 <= int(dimension) <= 10
@@ -245,47 +581,99 @@ def validar_ancho_alto(dimension:int) -> bool:
 # Tablero con formato
 
 
-def imprimir_tablero(tablero:List[List[str]]) -> None:
-    """Dado un tablero, imprime dicho tablero con un formato agradable para el usuario."""
+def formatear_tablero(tablero:List[List[str]]) -> str:
+    """Dado un tablero, devuelve el texto que muestra `imprimir_tablero`. Cada
+    celda ocupa cuatro caracteres: la de la fila f y la columna c esta en la
+    linea 5 + f, a partir del caracter 4 * c."""
     ancho = len(tablero[0])
-    alto = len(tablero)
-    print()
-    for i in range(ancho):
-            print(f'{i} |', end=' ')
-    print()
-    print('____'*ancho)
-    print()
-    for f in range(alto):
-        for c in range(ancho):
-            print(f'{tablero[f][c]} |', end=' ')
-        print()
-    print()
+    lineas = ['', ''.join(f'{i} | ' for i in range(ancho)), '____'*ancho, '']
+    for fila in tablero:
+        lineas.append(''.join(f'{celda} | ' for celda in fila))
+    lineas.append('')
+    return '\n'.join(lineas) + '\n'
+
+
+def imprimir_tablero(tablero:List[List[str]]) -> None:
+    """Dado un tablero, imprime dicho tablero con un formato agradable para el usuario.
+    Todo el tablero se escribe de una sola vez."""
+    sys.stdout.write(formatear_tablero(tablero))
+    sys.stdout.flush()
 
 
 # Jugar cuatro en linea
 
             
-def jugar(tablero:List[List[str]]) -> None:
-    """Dado un tablero, permite llevar a cabo una partida del juego cuatro en linea."""
+def jugar(tablero:List[List[str]], oponente=None, reflexion=None) -> None:
+    """Dado un tablero, permite llevar a cabo una partida del juego cuatro en linea.
+    Si se recibe un oponente (un objeto con el metodo `elegir_columna(tablero)`,
+    como `ia.JugadorIA`), este juega con O y el usuario con X.
+    Si se recibe una `reflexion.Reflexion`, mientras el usuario piensa se busca
+    en segundo plano una pista, que se muestra con 'h', y las respuestas del
+    oponente a cada jugada posible, para que responda al instante.
+    Si el tablero se creo con `bits=True`, las jugadas se pueden deshacer con
+    'd' y rehacer con 'r'. Contra un oponente se deshace o rehace tambien su
+    jugada, para que vuelva a ser el turno del usuario."""
     columnas = len(tablero[0]) - 1
+    columna = None
+    con_historial = not isinstance(tablero, list)
+    por_turno = 1 if oponente is None else 2
     while not tablero_completo(tablero):
         imprimir_tablero(tablero)
+        if oponente is not None and not es_turno_de_x(tablero):
+            respuesta = reflexion.respuesta(columna) if reflexion is not None else None
+            columna = respuesta if respuesta is not None else oponente.elegir_columna(tablero)
+            print(f'La computadora inserta O en la columna {columna}')
+            fila = insertar_simbolo_en_fila(tablero, columna)
+            ganador = obtener_ganador_desde(tablero, fila, columna)
+            if not ganador == ' ':
+                imprimir_tablero(tablero)
+                print(f"Ganó {ganador}!")
+                break
+            continue
+        if reflexion is not None:
+            reflexion.empezar(tablero)
         if es_turno_de_x(tablero):
             print(f'Columna para insertar X entre 0 y {columnas}')
         else:
             print(f'Columna para insertar O entre 0 y {columnas}')
+        if reflexion is not None:
+            print(f"O ingrese 'h' para ver una pista")
+        if con_historial:
+            print(f"O ingrese 'd' para deshacer o 'r' para rehacer")
         print(f"O ingrese 's' para salir")
         print()
         entrada = input('Entrada: ')
         print()
         if entrada == 's':
+            if reflexion is not None:
+                reflexion.detener()
             print('Partida finalizada')
             return
+        if entrada == 'h' and reflexion is not None:
+            print(f'Pista: columna {reflexion.pista()}')
+            continue
+        if entrada in ('d', 'r') and con_historial:
+            pila = tablero.jugadas if entrada == 'd' else tablero.deshechas
+            if len(pila) < por_turno:
+                print('No hay jugadas para deshacer' if entrada == 'd' else 'No hay jugadas para rehacer')
+                continue
+            for _ in range(por_turno):
+                if entrada == 'd':
+                    deshacer_simbolo(tablero)
+                else:
+                    rehacer_simbolo(tablero)
+            continue
         if not entrada.isdigit() or not 0 <= int(entrada) <= columnas:
             print('Opcion invalida')
             continue
-        insertar = insertar_simbolo(tablero, int(entrada))
-        ganador = obtener_ganador(tablero)
+        columna = int(entrada)
+        if columna_llena(tablero, columna):
+            print('La columna esta llena')
+            continue
+        if reflexion is not None:
+            reflexion.detener()
+        fila = insertar_simbolo_en_fila(tablero, columna)
+        ganador = obtener_ganador_desde(tablero, fila, columna)
         if not ganador == ' ':
             imprimir_tablero(tablero)
             print(f"Ganó {ganador}!")
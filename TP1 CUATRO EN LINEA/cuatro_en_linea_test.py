@@ -1,9 +1,22 @@
+import contextlib
+import io
+import os
 import pprint
+import random
 import sys
+import tempfile
 import traceback
 from typing import List
 
 import cuatro_en_linea
+import ia
+import libro_aperturas
+import mcts
+import registro_partidas
+import solucionador
+import tablas_finales
+import tablero_disperso
+import zobrist
 
 # Si las pruebas se ven mal en tu terminal, probá cambiando el valor
 # de esta constante a True para desactivar los colores ANSI.
@@ -394,6 +407,468 @@ def test_15_obtener_ganador_diagonal_inversa():
     )
 
 
+def test_16_tablero_bits_equivalente():
+    """Juega la misma partida en un tablero de listas y en un tablero de bits
+    5x6. Asegura que ambos tengan el mismo contenido, turno y ganador en cada
+    paso, y que la conversión entre ambas representaciones sea exacta."""
+    tablero = cuatro_en_linea.crear_tablero(5, 6)
+    tablero_bits = cuatro_en_linea.crear_tablero(5, 6, bits=True)
+    for col in (2, 3, 3, 4, 4, 5, 4, 5, 5, 0, 5, 6, 5):
+        assert cuatro_en_linea.insertar_simbolo(tablero, col) == (
+            cuatro_en_linea.insertar_simbolo(tablero_bits, col)
+        ), (
+            f"`insertar_simbolo` difiere entre representaciones para columna={col}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+        validar_estado(tablero, tablero_bits.a_lista())
+        assert cuatro_en_linea.es_turno_de_x(tablero) == (
+            cuatro_en_linea.es_turno_de_x(tablero_bits)
+        ), "`es_turno_de_x` difiere entre representaciones"
+        assert cuatro_en_linea.obtener_ganador(tablero) == (
+            cuatro_en_linea.obtener_ganador(tablero_bits)
+        ), (
+            "`obtener_ganador` difiere entre representaciones. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+    assert cuatro_en_linea.obtener_ganador(tablero_bits) == "X", (
+        f"`obtener_ganador` no devolvió \"X\". "
+        "Estado actual:\n"
+        f"{pprint.pformat(tablero_bits.a_lista())}\n"
+    )
+    copia = cuatro_en_linea.TableroBits.desde_lista(tablero)
+    validar_estado(tablero, copia.a_lista())
+    assert copia.alturas == tablero_bits.alturas, (
+        f"Alturas obtenidas {copia.alturas} no son las esperadas "
+        f"{tablero_bits.alturas}"
+    )
+
+
+def test_17_obtener_ganador_desde_ultima_jugada():
+    """Crea un nuevo juego 5x5 y arma un cuatro en línea en diagonal para X
+    usando `insertar_simbolo_en_fila`.
+    Asegura que la fila devuelta sea la correcta y que `obtener_ganador_desde`
+    coincida con `obtener_ganador` luego de cada inserción."""
+    tablero = cuatro_en_linea.crear_tablero(5, 5)
+    for col in (0, 1, 1, 2, 3, 2, 2, 3, 3, 4, 3):
+        fila = cuatro_en_linea.insertar_simbolo_en_fila(tablero, col)
+        assert fila is not None and tablero[fila][col] != " ", (
+            f"`insertar_simbolo_en_fila` devolvió {fila} para columna={col}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+        assert cuatro_en_linea.obtener_ganador_desde(tablero, fila, col) == (
+            cuatro_en_linea.obtener_ganador(tablero)
+        ), (
+            f"`obtener_ganador_desde` difiere de `obtener_ganador` en "
+            f"fila={fila}, columna={col}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+    assert cuatro_en_linea.obtener_ganador_desde(tablero, fila, col) == "X", (
+        f"`obtener_ganador_desde` no devolvió \"X\". "
+        "Estado actual:\n"
+        f"{pprint.pformat(tablero)}\n"
+    )
+    for _ in range(4):
+        cuatro_en_linea.insertar_simbolo(tablero, 4)
+    assert cuatro_en_linea.insertar_simbolo_en_fila(tablero, 4) is None, (
+        "`insertar_simbolo_en_fila` no devolvió None en una columna llena. "
+        "Estado actual:\n"
+        f"{pprint.pformat(tablero)}\n"
+    )
+
+
+def test_18_columna_llena_y_turnos():
+    """Crea un juego 4x4 con y sin tablero de bits y lo llena columna por
+    columna. Asegura que `columna_llena`, `es_turno_de_x` y `tablero_completo`
+    devuelvan lo mismo en ambos tableros en cada paso, que el tablero de
+    bits exponga la misma grilla que la lista de listas y que no se puedan
+    asignar sus celdas indexándolo."""
+    tablero = cuatro_en_linea.crear_tablero(4, 4)
+    tablero_bits = cuatro_en_linea.crear_tablero(4, 4, bits=True)
+    for col in range(4):
+        for _ in range(4):
+            for t in (tablero, tablero_bits):
+                assert not cuatro_en_linea.columna_llena(t, col), (
+                    f"`columna_llena` devolvió `True` para columna={col}. "
+                    "Estado actual:\n"
+                    f"{pprint.pformat(tablero)}\n"
+                )
+                cuatro_en_linea.insertar_simbolo(t, col)
+            assert cuatro_en_linea.es_turno_de_x(tablero) == (
+                cuatro_en_linea.es_turno_de_x(tablero_bits)
+            ), "`es_turno_de_x` difiere entre representaciones"
+            assert cuatro_en_linea.tablero_completo(tablero) == (
+                cuatro_en_linea.tablero_completo(tablero_bits)
+            ), "`tablero_completo` difiere entre representaciones"
+        assert cuatro_en_linea.columna_llena(tablero_bits, col), (
+            f"`columna_llena` devolvió `False` para columna={col}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+    validar_estado(tablero, tablero_bits.grilla)
+    assert cuatro_en_linea.tablero_completo(tablero_bits), (
+        f"`tablero_completo` devolvió `False` cuando debería devolver `True`. "
+        "Estado actual:\n"
+        f"{pprint.pformat(tablero)}\n"
+    )
+    try:
+        tablero_bits[0][0] = " "
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Se pudo asignar una celda indexando el tablero de bits")
+
+
+def test_19_deshacer_y_rehacer():
+    """Crea un juego 5x5 con tablero de bits, inserta símbolos y los deshace
+    uno a uno. Asegura que cada estado intermedio sea igual al de un tablero
+    de lista con las mismas jugadas, que el turno vuelva atrás, que
+    `rehacer_simbolo` restaure las jugadas y que una jugada nueva descarte
+    las deshechas."""
+    jugadas = (0, 1, 1, 2, 2, 2, 4)
+    tablero_bits = cuatro_en_linea.crear_tablero(5, 5, bits=True)
+    for col in jugadas:
+        cuatro_en_linea.insertar_simbolo(tablero_bits, col)
+    for n in range(len(jugadas), 0, -1):
+        tablero = cuatro_en_linea.crear_tablero(5, 5)
+        for col in jugadas[:n]:
+            cuatro_en_linea.insertar_simbolo(tablero, col)
+        validar_estado(tablero, tablero_bits.grilla)
+        assert cuatro_en_linea.deshacer_simbolo(tablero_bits), (
+            "`deshacer_simbolo` devolvió `False` con jugadas para deshacer"
+        )
+        assert cuatro_en_linea.es_turno_de_x(tablero_bits) == (n % 2 == 1), (
+            "`deshacer_simbolo` no devolvió el turno a quien insertó el símbolo"
+        )
+    validar_estado(cuatro_en_linea.crear_tablero(5, 5), tablero_bits.grilla)
+    assert not cuatro_en_linea.deshacer_simbolo(tablero_bits), (
+        "`deshacer_simbolo` devolvió `True` en un tablero vacío"
+    )
+    for col in jugadas:
+        assert cuatro_en_linea.rehacer_simbolo(tablero_bits), (
+            "`rehacer_simbolo` devolvió `False` con jugadas para rehacer"
+        )
+    assert not cuatro_en_linea.rehacer_simbolo(tablero_bits), (
+        "`rehacer_simbolo` devolvió `True` sin jugadas para rehacer"
+    )
+    assert cuatro_en_linea.obtener_ganador(tablero_bits) == ' '
+    cuatro_en_linea.deshacer_simbolo(tablero_bits)
+    cuatro_en_linea.insertar_simbolo(tablero_bits, 3)
+    assert not cuatro_en_linea.rehacer_simbolo(tablero_bits), (
+        "`rehacer_simbolo` rehizo una jugada después de insertar otra"
+    )
+
+
+def test_20_jugador_ia_gana_y_bloquea():
+    """Crea juegos 5x5 en los que X tiene tres en línea en la fila de abajo
+    o en una columna. Asegura que `JugadorIA` complete el cuatro en línea
+    cuando le toca a X y que lo bloquee cuando le toca a O."""
+    jugador = ia.JugadorIA(4, tiempo=float("inf"))
+    for jugadas, esperada in (((0, 0, 1, 1, 2, 2), 3), ((0, 1, 0, 2, 0), 0)):
+        tablero = cuatro_en_linea.crear_tablero(5, 5)
+        for col in jugadas:
+            cuatro_en_linea.insertar_simbolo(tablero, col)
+        columna = jugador.elegir_columna(tablero)
+        assert columna == esperada, (
+            f"`elegir_columna` devolvió {columna} en lugar de {esperada}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+
+
+def test_21_jugador_mcts_gana_y_bloquea():
+    """Igual que `test_20_jugador_ia_gana_y_bloquea`, pero con `JugadorMCTS`
+    en un solo proceso y con semilla fija. Asegura además que sin
+    simulaciones devuelva la columna libre más cercana al centro."""
+    jugador = mcts.JugadorMCTS(2000, procesos=1, semilla=0)
+    for jugadas, esperada in (((0, 0, 1, 1, 2, 2), 3), ((0, 1, 0, 2, 0), 0)):
+        tablero = cuatro_en_linea.crear_tablero(5, 5)
+        for col in jugadas:
+            cuatro_en_linea.insertar_simbolo(tablero, col)
+        columna = jugador.elegir_columna(tablero)
+        assert columna == esperada, (
+            f"`elegir_columna` devolvió {columna} en lugar de {esperada}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero)}\n"
+        )
+    tablero = cuatro_en_linea.crear_tablero(3, 5)
+    for col in (2, 2, 2):
+        cuatro_en_linea.insertar_simbolo(tablero, col)
+    columna = mcts.JugadorMCTS(0, procesos=1).elegir_columna(tablero)
+    assert columna == 1, (
+        f"Sin simulaciones `elegir_columna` devolvió {columna} en lugar de 1"
+    )
+
+
+def test_22_lote_equivalente():
+    """Juega partidas al azar en lotes de tableros de 4 a 10 filas y
+    columnas, con columnas inválidas y llenas entre las jugadas. Asegura que
+    en cada paso `LoteTableros` inserte en los mismos tableros, tenga las
+    mismas celdas y los mismos ganadores que los tableros de lista.
+    Se omite si no está instalado NumPy, que sólo usa `lote`."""
+    try:
+        import lote
+    except ImportError:
+        print("(se omite: falta NumPy) ", end="")
+        return
+    generador = random.Random(0)
+    for n_filas in range(4, 11):
+        for n_columnas in range(4, 11):
+            tableros = [cuatro_en_linea.crear_tablero(n_filas, n_columnas) for _ in range(4)]
+            lote_tableros = lote.LoteTableros(len(tableros), n_filas, n_columnas)
+            for _ in range(n_filas * n_columnas * 2):
+                columnas = [generador.randint(-1, n_columnas) for _ in tableros]
+                insertados = lote_tableros.insertar(columnas)
+                for tablero, col, insertado in zip(tableros, columnas, insertados):
+                    assert cuatro_en_linea.insertar_simbolo(tablero, col) == insertado, (
+                        f"`insertar` difiere de `insertar_simbolo` para columna={col}. "
+                        "Estado actual:\n"
+                        f"{pprint.pformat(tablero)}\n"
+                    )
+                for tablero, copia, ganador in zip(tableros, lote_tableros.a_tableros(), lote_tableros.ganadores_simbolos()):
+                    validar_estado(tablero, copia)
+                    assert cuatro_en_linea.obtener_ganador(tablero) == ganador, (
+                        f"`ganadores` devolvió \"{ganador}\" en lugar de lo mismo que `obtener_ganador`. "
+                        "Estado actual:\n"
+                        f"{pprint.pformat(tablero)}\n"
+                    )
+            completos = [cuatro_en_linea.tablero_completo(tablero) for tablero in tableros]
+            assert lote_tableros.tableros_completos().tolist() == completos, (
+                "`tableros_completos` difiere de `tablero_completo`"
+            )
+
+
+def test_23_libro_aperturas():
+    """Escribe un libro de aperturas 5x5 con una sola posición: X en la
+    columna 0. Asegura que el libro devuelva su valor y su columna para esa
+    posición, la columna reflejada para X en la columna 4, nada para otras
+    posiciones, y que `JugadorIA` juegue la columna del libro."""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "libro.bin")
+        tablero = cuatro_en_linea.crear_tablero(5, 5, bits=True)
+        cuatro_en_linea.insertar_simbolo(tablero, 0)
+        hash_posicion = zobrist.HashPosicion(5, 5, tablero)
+        libro_aperturas.escribir_libro(ruta, 5, 5, 1, {hash_posicion.canonica(): (7, hash_posicion.a_canonica(1))})
+        libro = libro_aperturas.LibroAperturas(ruta)
+        try:
+            for col, esperado in ((0, (7, 1)), (4, (7, 3)), (2, None)):
+                tablero = cuatro_en_linea.crear_tablero(5, 5, bits=True)
+                cuatro_en_linea.insertar_simbolo(tablero, col)
+                encontrado = libro.buscar(*zobrist.claves_tablero(tablero, zobrist.claves_zobrist(5, 5)))
+                assert encontrado == esperado, (
+                    f"`buscar` devolvió {encontrado} en lugar de {esperado} para X en la columna {col}"
+                )
+            tablero = cuatro_en_linea.crear_tablero(5, 5, bits=True)
+            cuatro_en_linea.insertar_simbolo(tablero, 4)
+            columna = ia.JugadorIA(libro=libro).elegir_columna(tablero)
+            assert columna == 3, (
+                f"`elegir_columna` devolvió {columna} en lugar de la columna 3 del libro"
+            )
+        finally:
+            libro.cerrar()
+
+
+def test_24_zobrist_espejo():
+    """Juega una partida 5x6 y otra con las mismas jugadas reflejadas.
+    Asegura que en cada paso la clave de cada posición sea la clave espejo
+    de la otra, que ambas tengan la misma clave canónica y que
+    `HashPosicion` actualizada de a una jugada coincida con
+    `claves_tablero`."""
+    claves = zobrist.claves_zobrist(5, 6)
+    tablero = cuatro_en_linea.crear_tablero(5, 6, bits=True)
+    reflejado = cuatro_en_linea.crear_tablero(5, 6, bits=True)
+    hash_posicion = zobrist.HashPosicion(5, 6)
+    for col in (0, 1, 1, 2, 5, 3, 3, 4, 0, 2):
+        hash_posicion.alternar(col, tablero.alturas[col], tablero.es_turno_de_x())
+        cuatro_en_linea.insertar_simbolo(tablero, col)
+        cuatro_en_linea.insertar_simbolo(reflejado, zobrist.espejar_columna(col, 6))
+        clave, espejo = zobrist.claves_tablero(tablero, claves)
+        clave_reflejado, espejo_reflejado = zobrist.claves_tablero(reflejado, claves)
+        assert (clave, espejo) == (espejo_reflejado, clave_reflejado), (
+            "Las claves de la posición no son las espejo de las del reflejo. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero.a_lista())}\n"
+        )
+        assert zobrist.clave_canonica(clave, espejo) == zobrist.clave_canonica(clave_reflejado, espejo_reflejado), (
+            "La posición y su reflejo tienen distinta clave canónica"
+        )
+        assert (hash_posicion.clave, hash_posicion.espejo) == (clave, espejo), (
+            "`HashPosicion` difiere de `claves_tablero`"
+        )
+
+
+def test_25_solucionador_tablero_chico():
+    """Resuelve posiciones de un tablero 4x4. Asegura que con X en la columna
+    1 la partida termine empatada al llenarse el tablero y que la columna
+    devuelta mantenga el empate, y que con tres X en la fila de abajo X gane
+    en la próxima jugada por la columna 3."""
+    solucionador_4x4 = solucionador.Solucionador()
+    for jugadas, esperado in (("1", (" ", 15)), ("12", (" ", 14)), ("001122", ("X", 1, 3))):
+        tablero = solucionador.tablero_desde_jugadas(4, 4, jugadas)
+        resultado = solucionador_4x4.resolver(tablero)
+        assert resultado[:len(esperado)] == esperado, (
+            f"`resolver` devolvió {resultado} para las jugadas {jugadas}. "
+            "Estado actual:\n"
+            f"{pprint.pformat(tablero.a_lista())}\n"
+        )
+    columna = solucionador_4x4.resolver(solucionador.tablero_desde_jugadas(4, 4, "1"))[2]
+    assert solucionador_4x4.resolver(solucionador.tablero_desde_jugadas(4, 4, f"1{columna}"))[0] == " ", (
+        f"`resolver` devolvió la columna {columna}, que pierde el empate"
+    )
+
+
+def test_26_registro_partidas():
+    """Guarda partidas de distintos tamaños en un registro, en dos sesiones
+    de escritura, y lo lee con bloques de pocos bytes para que los registros
+    queden partidos entre bloques. Asegura que se lean las mismas partidas
+    en el mismo orden, y que `analizar` rechace con ValueError las partidas
+    con una columna inexistente o llena."""
+    generador = random.Random(0)
+    partidas = [(4, 4, [])]
+    for n_filas, n_columnas in ((4, 4), (6, 7), (10, 10), (5, 9), (8, 5)):
+        jugadas = [generador.randrange(n_columnas) for _ in range(generador.randint(1, n_filas * n_columnas))]
+        partidas.append((n_filas, n_columnas, jugadas))
+    tamanio_bloque = registro_partidas.TAMANIO_BLOQUE
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "partidas.bin")
+        for mitad in (partidas[:3], partidas[3:]):
+            with registro_partidas.EscritorRegistro(ruta) as escritor:
+                for partida in mitad:
+                    escritor.agregar(*partida)
+        try:
+            registro_partidas.TAMANIO_BLOQUE = 7
+            leidas = list(registro_partidas.leer_partidas(ruta))
+        finally:
+            registro_partidas.TAMANIO_BLOQUE = tamanio_bloque
+    assert leidas == partidas, (
+        "`leer_partidas` no devolvió las partidas guardadas. "
+        f"Guardadas:\n{pprint.pformat(partidas)}\n"
+        f"Leídas:\n{pprint.pformat(leidas)}\n"
+    )
+    for jugadas in ([7], [0, 0, 0, 0, 0]):
+        try:
+            registro_partidas.analizar([(4, 5, jugadas)])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"`analizar` no lanzó ValueError para las jugadas inválidas {jugadas}")
+
+
+def test_27_tabla_finales_coincide_con_solucionador():
+    """Genera la tabla de finales 4x4 y recorre todas las posiciones sin
+    ganador de hasta 3 jugadas. Asegura que la tabla dé en cada una el mismo
+    ganador que `Solucionador`."""
+    solucionador_4x4 = solucionador.Solucionador()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "tabla.bin")
+        with contextlib.redirect_stdout(io.StringIO()):
+            tablas_finales.generar_tabla(ruta, 4, 4, 1)
+        tabla = tablas_finales.TablaFinales(ruta)
+        try:
+            pendientes = [""]
+            while pendientes:
+                jugadas = pendientes.pop()
+                tablero = solucionador.tablero_desde_jugadas(4, 4, jugadas)
+                esperado = solucionador_4x4.resolver(tablero)[0]
+                ganador = tabla.ganador(tablero)
+                assert ganador == esperado, (
+                    f"`ganador` devolvió {ganador!r} en lugar de {esperado!r} para las jugadas {jugadas}. "
+                    "Estado actual:\n"
+                    f"{pprint.pformat(tablero.a_lista())}\n"
+                )
+                if len(jugadas) < 3:
+                    for col in range(4):
+                        hijo = solucionador.tablero_desde_jugadas(4, 4, jugadas + str(col))
+                        if cuatro_en_linea.obtener_ganador(hijo) == " ":
+                            pendientes.append(jugadas + str(col))
+        finally:
+            tabla.cerrar()
+
+
+def test_28_cache_evaluacion_descarta_la_mas_vieja():
+    """Crea una `CacheEvaluacion` con lugar para dos posiciones y evalúa las
+    claves 1, 2, 1 y 3. Asegura que la segunda evaluación de 1 no llame a la
+    función, que al agregar 3 se descarte 2 (la usada hace más tiempo) y que
+    los contadores reflejen los aciertos, fallos y descartes."""
+    llamadas = []
+
+    def funcion(tablero):
+        llamadas.append(tablero)
+        return len(llamadas)
+
+    cache = ia.CacheEvaluacion(funcion, 2 * ia.CacheEvaluacion.BYTES_POR_ENTRADA)
+    for clave in (1, 2, 1, 3):
+        cache.evaluar(clave, clave)
+    assert llamadas == [1, 2, 3], (
+        f"La función se llamó para {llamadas} en lugar de [1, 2, 3]"
+    )
+    assert list(cache.entradas) == [1, 3], (
+        f"La cache guardó las claves {list(cache.entradas)} en lugar de [1, 3]"
+    )
+    assert (cache.aciertos, cache.fallos, cache.descartes) == (1, 3, 1), (
+        f"Contadores obtenidos {(cache.aciertos, cache.fallos, cache.descartes)} "
+        "no son los esperados (1, 3, 1)"
+    )
+    assert cache.evaluar(1, 1) == 1 and cache.evaluar(2, 2) == 4, (
+        "`evaluar` no devolvió el valor guardado o no recalculó el descartado"
+    )
+
+
+def test_29_tablero_disperso_gigante_con_k_6():
+    """Juega en un `TableroDisperso` de 10000 x 10000 con k = 6 una línea
+    vertical, una horizontal y una diagonal en columnas de los bordes y del
+    medio. Asegura que cinco símbolos en línea no ganen, que el sexto sí, y
+    que el tablero guarde sólo las celdas ocupadas."""
+    def jugar(tablero, columnas):
+        for columna in columnas:
+            assert tablero.insertar(columna), f"No se pudo insertar en la columna {columna}"
+
+    def verificar(tablero, nombre, esperado):
+        ganador = tablero.ganador_desde(*tablero.ultima_jugada)
+        assert ganador == tablero.ganador() == esperado, (
+            f"Línea {nombre}: se obtuvo {ganador!r} en lugar de {esperado!r} "
+            f"luego de jugar {tablero.jugadas}"
+        )
+        assert len(tablero.celdas) == tablero.movimientos, (
+            f"Se guardaron {len(tablero.celdas)} celdas luego de "
+            f"{tablero.movimientos} jugadas"
+        )
+
+    # Vertical: X apila en la última columna y O en la primera.
+    tablero = tablero_disperso.TableroDisperso(10000, 10000, k=6)
+    jugar(tablero, [9999, 0] * 5)
+    verificar(tablero, "vertical de cinco", ' ')
+    jugar(tablero, [9999])
+    verificar(tablero, "vertical", 'X')
+
+    # Horizontal: X en la fila de abajo y O encima de cada símbolo de X.
+    tablero = tablero_disperso.TableroDisperso(10000, 10000, k=6)
+    for columna in range(5000, 5005):
+        jugar(tablero, [columna, columna])
+    verificar(tablero, "horizontal de cinco", ' ')
+    jugar(tablero, [5005])
+    verificar(tablero, "horizontal", 'X')
+
+    # Diagonal: O rellena una escalera en las últimas columnas mientras X
+    # juega lejos, y después X sube por la escalera mientras O juega lejos.
+    tablero = tablero_disperso.TableroDisperso(10000, 10000, k=6)
+    relleno = [9994 + i for i in range(6) for _ in range(i)]
+    for j, columna in enumerate(relleno):
+        jugar(tablero, [1000 + 10 * j, columna])
+    for i in range(5):
+        jugar(tablero, [9994 + i, 2000 + 10 * i])
+    verificar(tablero, "diagonal de cinco", ' ')
+    jugar(tablero, [9999])
+    verificar(tablero, "diagonal", 'X')
+    assert len(tablero.celdas) == 41 and len(tablero.alturas) == 26, (
+        f"Se guardaron {len(tablero.celdas)} celdas y {len(tablero.alturas)} "
+        "alturas en lugar de 41 y 26"
+    )
+
+
 # Sólo se van a correr aquellos tests que estén mencionados dentro de la
 # siguiente constante
 TESTS = (
@@ -412,6 +887,20 @@ TESTS = (
     test_13_obtener_ganador_vertical,
     test_14_obtener_ganador_diagonal,
     test_15_obtener_ganador_diagonal_inversa,
+    test_16_tablero_bits_equivalente,
+    test_17_obtener_ganador_desde_ultima_jugada,
+    test_18_columna_llena_y_turnos,
+    test_19_deshacer_y_rehacer,
+    test_20_jugador_ia_gana_y_bloquea,
+    test_21_jugador_mcts_gana_y_bloquea,
+    test_22_lote_equivalente,
+    test_23_libro_aperturas,
+    test_24_zobrist_espejo,
+    test_25_solucionador_tablero_chico,
+    test_26_registro_partidas,
+    test_27_tabla_finales_coincide_con_solucionador,
+    test_28_cache_evaluacion_descarta_la_mas_vieja,
+    test_29_tablero_disperso_gigante_con_k_6,
 )
 
 # El código que viene abajo tiene algunas *magias* para simplificar la corrida
@@ -488,4 +977,5 @@ def main():
         )
 
 
-main()
+if __name__ == '__main__':
+    main()
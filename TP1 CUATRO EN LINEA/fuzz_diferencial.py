@@ -0,0 +1,187 @@
+import argparse
+import multiprocessing
+import random
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+import cuatro_en_linea
+import torneo
+from tablero_disperso import TableroDisperso
+
+# Implementaciones que se comparan contra la de referencia (las funciones de
+# `cuatro_en_linea` sobre listas de listas). Cada una es una función que crea
+# un tablero vacío de n_filas por n_columnas.
+IMPLEMENTACIONES: Dict[str, Callable] = {
+    'bits': lambda n_filas, n_columnas: cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True),
+    'disperso': TableroDisperso,
+}
+
+TAMANIOS = [(f, c) for f in range(4, 11) for c in range(4, 11)]
+
+Diferencia = Tuple[int, str]
+
+
+def _estado(tablero) -> Tuple[bool, bool, str]:
+    return (
+        cuatro_en_linea.es_turno_de_x(tablero),
+        cuatro_en_linea.tablero_completo(tablero),
+        cuatro_en_linea.obtener_ganador(tablero),
+    )
+
+
+def _simbolos_con_linea(tablero: List[List[str]]) -> Set[str]:
+    """Devuelve los símbolos que tienen algún cuatro en línea."""
+    simbolos = set()
+    for (f1, c1), (f2, c2), (f3, c3), (f4, c4) in cuatro_en_linea.ventanas_ganadoras(len(tablero), len(tablero[0])):
+        simbolo = tablero[f1][c1]
+        if simbolo != ' ' and simbolo == tablero[f2][c2] == tablero[f3][c3] == tablero[f4][c4]:
+            simbolos.add(simbolo)
+    return simbolos
+
+
+def _coinciden(referencia: List[List[str]], esperado: Tuple, obtenido: Tuple) -> bool:
+    """Compara dos estados. Si ambos símbolos tienen un cuatro en línea,
+    `obtener_ganador` puede devolver cualquiera de los dos."""
+    if esperado[:2] != obtenido[:2]:
+        return False
+    if esperado[2] == obtenido[2]:
+        return True
+    return esperado[2] != ' ' and obtenido[2] in _simbolos_con_linea(referencia)
+
+
+def _describir(estado: Tuple[bool, bool, str]) -> str:
+    es_turno_de_x, completo, ganador = estado
+    return f'es_turno_de_x={es_turno_de_x}, tablero_completo={completo}, obtener_ganador={ganador!r}'
+
+
+def primera_diferencia(nombre: str, n_filas: int, n_columnas: int, jugadas: List[int]) -> Diferencia:
+    """Juega `jugadas` con `insertar_simbolo` en un tablero de referencia y en
+    uno de la implementación `nombre`, comparando después de cada jugada el
+    resultado de `insertar_simbolo`, `es_turno_de_x`, `tablero_completo` y
+    `obtener_ganador`. Devuelve (cantidad de jugadas hechas, descripción) de
+    la primera diferencia, o None si siempre coinciden. Una excepción en la
+    implementación también cuenta como diferencia."""
+    referencia = cuatro_en_linea.crear_tablero(n_filas, n_columnas)
+    paso = 0
+    try:
+        tablero = IMPLEMENTACIONES[nombre](n_filas, n_columnas)
+        esperado, obtenido = _estado(referencia), _estado(tablero)
+        if not _coinciden(referencia, esperado, obtenido):
+            return paso, f'esperado {_describir(esperado)}; obtenido {_describir(obtenido)}'
+        for paso, columna in enumerate(jugadas, 1):
+            esperado = cuatro_en_linea.insertar_simbolo(referencia, columna)
+            obtenido = cuatro_en_linea.insertar_simbolo(tablero, columna)
+            if esperado != obtenido:
+                return paso, f'insertar_simbolo(columna={columna}): esperado {esperado}, obtenido {obtenido}'
+            esperado, obtenido = _estado(referencia), _estado(tablero)
+            if not _coinciden(referencia, esperado, obtenido):
+                return paso, f'esperado {_describir(esperado)}; obtenido {_describir(obtenido)}'
+    except Exception as exc:
+        return paso, f'{type(exc).__name__}: {exc}'
+    return None
+
+
+def minimizar(nombre: str, n_filas: int, n_columnas: int, jugadas: List[int]) -> List[int]:
+    """Achica una secuencia de jugadas que produce una diferencia: la corta
+    justo después de la primera diferencia y después quita bloques de
+    jugadas, cada vez más chicos, mientras la diferencia se siga produciendo.
+    Como las jugadas inválidas no modifican el tablero, cualquier
+    subsecuencia es una partida que se puede reproducir."""
+    paso, _ = primera_diferencia(nombre, n_filas, n_columnas, jugadas)
+    jugadas = jugadas[:paso]
+    bloque = len(jugadas) // 2
+    while bloque > 0:
+        inicio = 0
+        while inicio < len(jugadas):
+            candidata = jugadas[:inicio] + jugadas[inicio + bloque:]
+            diferencia = primera_diferencia(nombre, n_filas, n_columnas, candidata)
+            if diferencia is not None:
+                jugadas = candidata[:diferencia[0]]
+            else:
+                inicio += bloque
+        bloque //= 2
+    return jugadas
+
+
+def partida_aleatoria(generador: random.Random, tamanios: List[Tuple[int, int]]) -> Tuple[int, int, List[int]]:
+    """Devuelve un tamaño de tablero y una secuencia de jugadas al azar. Las
+    secuencias pueden seguir después de que haya un ganador o de que el
+    tablero esté completo, y algunas jugadas son columnas fuera de rango."""
+    n_filas, n_columnas = generador.choice(tamanios)
+    largo = generador.randint(0, n_filas * n_columnas + 4)
+    jugadas = []
+    for _ in range(largo):
+        if generador.random() < 0.05:
+            jugadas.append(generador.choice((-1, n_columnas)))
+        else:
+            jugadas.append(generador.randrange(n_columnas))
+    return n_filas, n_columnas, jugadas
+
+
+def _fuzzear(tarea: Tuple) -> Tuple:
+    """Unidad de trabajo de cada proceso: juega `partidas` secuencias al azar
+    y se detiene en la primera que produce una diferencia."""
+    nombres, tamanios, partidas, semilla = tarea
+    generador = random.Random(semilla)
+    total_jugadas = 0
+    for jugada in range(partidas):
+        n_filas, n_columnas, jugadas = partida_aleatoria(generador, tamanios)
+        total_jugadas += len(jugadas)
+        for nombre in nombres:
+            if primera_diferencia(nombre, n_filas, n_columnas, jugadas) is not None:
+                return jugada + 1, total_jugadas, (nombre, n_filas, n_columnas, jugadas)
+    return partidas, total_jugadas, None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compara las implementaciones de tablero contra la de referencia en partidas al azar.')
+    parser.add_argument('--implementaciones', default=','.join(IMPLEMENTACIONES),
+                        help=f"implementaciones separadas por comas, de entre: {', '.join(IMPLEMENTACIONES)}")
+    parser.add_argument('--partidas', type=int, default=100_000, help='cantidad total de secuencias al azar')
+    parser.add_argument('--tamanios', type=torneo.leer_tamanios,
+                        help="tamaños como '6x7,5x5' o '4-10' (cuadrados); por defecto, todos los validos")
+    parser.add_argument('--procesos', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--tanda', type=int, default=1000, help='secuencias por unidad de trabajo')
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+    nombres = args.implementaciones.split(',')
+    for nombre in nombres:
+        if nombre not in IMPLEMENTACIONES:
+            parser.error(f'implementacion desconocida: {nombre}')
+    tamanios = args.tamanios or TAMANIOS
+
+    tareas = []
+    for inicio in range(0, args.partidas, args.tanda):
+        tareas.append((nombres, tamanios, min(args.tanda, args.partidas - inicio), args.semilla + len(tareas)))
+    total_partidas = 0
+    total_jugadas = 0
+    divergencia = None
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(args.procesos) as pool:
+        # `imap` devuelve las tandas en orden, así que la diferencia informada
+        # es siempre la misma para una misma semilla.
+        for partidas, jugadas, divergencia in pool.imap(_fuzzear, tareas):
+            total_partidas += partidas
+            total_jugadas += jugadas
+            if divergencia is not None:
+                pool.terminate()
+                break
+    duracion = time.perf_counter() - inicio
+
+    print(f'{total_partidas} partidas, {total_jugadas} jugadas en {duracion:.2f} s con {args.procesos} procesos '
+          f'({total_jugadas / duracion:.0f} jugadas/s)')
+    if divergencia is None:
+        print(f"Sin diferencias en: {', '.join(nombres)}")
+        return
+    nombre, n_filas, n_columnas, jugadas = divergencia
+    minima = minimizar(nombre, n_filas, n_columnas, jugadas)
+    paso, descripcion = primera_diferencia(nombre, n_filas, n_columnas, minima)
+    print(f'Diferencia en {nombre!r}, tablero {n_filas}x{n_columnas}')
+    print(f'  secuencia original: {len(jugadas)} jugadas')
+    print(f'  secuencia minima: {minima}')
+    print(f'  tras la jugada {paso}: {descripcion}')
+
+
+if __name__ == '__main__':
+    main()
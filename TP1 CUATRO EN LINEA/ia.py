@@ -0,0 +1,317 @@
+import collections
+import time
+from typing import Callable, List
+
+import cuatro_en_linea
+import zobrist
+
+VICTORIA = 1_000_000
+INFINITO = 10 * VICTORIA
+
+EXACTA = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+# Dificultad: (profundidad máxima, segundos por jugada)
+DIFICULTADES = {
+    'facil': (2, 0.2),
+    'media': (6, 1.0),
+    'dificil': (42, 3.0),
+}
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+class TablaTransposicion:
+    """Tabla de transposición de tamaño fijo indexada por clave Zobrist
+    canónica (ver `zobrist.clave_canonica`), de modo que una posición y su
+    imagen espejo comparten la misma entrada.
+
+    Cada clave tiene una única casilla (`clave % tamaño`). Al guardar en una
+    casilla ocupada por otra posición, se reemplaza la entrada si pertenece a
+    una búsqueda anterior o si la nueva se buscó con igual o mayor
+    profundidad; así la tabla nunca supera `tamanio` entradas y conserva los
+    resultados más caros de recalcular.
+    """
+
+    def __init__(self, tamanio: int = 1 << 18):
+        self.tamanio = tamanio
+        self.entradas = [None] * tamanio
+        self.busqueda = 0
+
+    def nueva_busqueda(self) -> None:
+        """Marca el comienzo de una nueva búsqueda: las entradas anteriores
+        pasan a poder reemplazarse siempre."""
+        self.busqueda += 1
+
+    def buscar(self, clave: int):
+        """Devuelve la entrada (clave, profundidad, valor, tipo, columna,
+        busqueda) guardada para la clave, o None si no hay."""
+        entrada = self.entradas[clave % self.tamanio]
+        if entrada is not None and entrada[0] == clave:
+            return entrada
+        return None
+
+    def guardar(self, clave: int, profundidad: int, valor: int, tipo: int, columna: int) -> None:
+        """Guarda el resultado de buscar la posición con la clave dada."""
+        indice = clave % self.tamanio
+        anterior = self.entradas[indice]
+        if (anterior is None or anterior[0] == clave
+                or anterior[5] != self.busqueda or profundidad >= anterior[1]):
+            self.entradas[indice] = (clave, profundidad, valor, tipo, columna, self.busqueda)
+
+
+class CacheEvaluacion:
+    """Memoriza los resultados de una función de evaluación por clave de
+    posición (por ejemplo, la clave Zobrist), para no recalcularlos cuando
+    la búsqueda llega a la misma posición por otro orden de jugadas.
+
+    Ocupa a lo sumo alrededor de `memoria_maxima` bytes: cuando se llena,
+    descarta la posición usada hace más tiempo. Cuenta los aciertos, los
+    fallos y los descartes.
+    """
+
+    # Memoria aproximada de cada entrada (clave, valor y nodo del
+    # OrderedDict), medida con tracemalloc.
+    BYTES_POR_ENTRADA = 170
+
+    def __init__(self, funcion: Callable[[List[List[str]]], int], memoria_maxima: int = 8 << 20):
+        self.funcion = funcion
+        self.capacidad = max(1, memoria_maxima // self.BYTES_POR_ENTRADA)
+        self.entradas = collections.OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    def evaluar(self, clave: int, tablero: List[List[str]]) -> int:
+        """Devuelve el valor de la posición con la clave dada, calculándolo
+        con la función sólo si no está guardado."""
+        valor = self.entradas.get(clave)
+        if valor is not None:
+            self.aciertos += 1
+            self.entradas.move_to_end(clave)
+            return valor
+        self.fallos += 1
+        valor = self.funcion(tablero)
+        self.entradas[clave] = valor
+        if len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+            self.descartes += 1
+        return valor
+
+    def tasa_aciertos(self) -> float:
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+    def vaciar(self) -> None:
+        self.entradas.clear()
+
+
+def evaluar(tablero: List[List[str]]) -> int:
+    """Dado un tablero sin ganador, devuelve una estimación de qué tan buena
+    es la posición para el jugador al que le toca mover. Premia los símbolos
+    en la columna central (las dos del medio si el ancho es par) y las líneas
+    de cuatro celdas que tienen dos o tres símbolos de un mismo jugador y
+    ninguno del rival. Las líneas se recorren con la tabla precalculada de
+    `cuatro_en_linea.ventanas_ganadoras`. Da el mismo valor a una posición y
+    a su imagen espejo, como supone la tabla de transposición."""
+    alto = len(tablero)
+    ancho = len(tablero[0])
+    propio = 'X' if cuatro_en_linea.es_turno_de_x(tablero) else 'O'
+    puntaje = 0
+    for centro in {(ancho - 1) // 2, ancho // 2}:
+        for f in range(alto):
+            simbolo = tablero[f][centro]
+            if simbolo == propio:
+                puntaje += 3
+            elif simbolo != ' ':
+                puntaje -= 3
+    for ventana in cuatro_en_linea.ventanas_ganadoras(alto, ancho):
+        propios = 0
+        ajenos = 0
+        for f, c in ventana:
+            simbolo = tablero[f][c]
+            if simbolo == propio:
+                propios += 1
+            elif simbolo != ' ':
+                ajenos += 1
+        if ajenos == 0:
+            puntaje += _PESOS_LINEA[propios]
+        elif propios == 0:
+            puntaje -= _PESOS_LINEA[ajenos]
+    return puntaje
+
+
+_PESOS_LINEA = (0, 0, 2, 5, 0)
+
+
+class JugadorIA:
+    """Oponente que elige columnas con negamax y poda alfa-beta.
+
+    La búsqueda se hace por profundización iterativa: se busca a profundidad
+    1, 2, 3... hasta `profundidad` o hasta agotar `tiempo` segundos, y se
+    juega la mejor columna de la última profundidad completa. Las columnas se
+    prueban primero la mejor según la tabla de transposición y luego del
+    centro hacia los bordes. La tabla guarda las columnas en la orientación
+    canónica de cada posición.
+
+    Si se indica un `libro` (ver `libro_aperturas.LibroAperturas`) y la
+    posición está en él, se juega la columna del libro sin buscar.
+
+    Las evaluaciones de las hojas se guardan en una `CacheEvaluacion` de
+    hasta `memoria_evaluacion` bytes, indexada por la clave Zobrist canónica
+    de la posición, como la tabla de transposición. Se vacía si cambia el
+    tamaño del tablero.
+
+    Si el atributo `cancelar` es un `threading.Event`, la búsqueda termina
+    en cuanto se activa, como si se hubiera agotado el tiempo. Permite
+    interrumpir desde otro hilo una búsqueda en segundo plano.
+    """
+
+    def __init__(self, profundidad: int = 6, tiempo: float = 1.0, tamanio_tabla: int = 1 << 18, libro=None,
+                 memoria_evaluacion: int = 8 << 20):
+        self.profundidad = profundidad
+        self.tiempo = tiempo
+        self.tabla = TablaTransposicion(tamanio_tabla)
+        self.libro = libro
+        self.evaluacion = CacheEvaluacion(evaluar, memoria_evaluacion)
+        self.claves = None
+        self.nodos = 0
+        self.valor = 0
+        self.cancelar = None
+        self._limite = None
+
+    @classmethod
+    def con_dificultad(cls, dificultad: str) -> 'JugadorIA':
+        """Crea un jugador con una de las dificultades de `DIFICULTADES`."""
+        profundidad, tiempo = DIFICULTADES[dificultad]
+        return cls(profundidad, tiempo)
+
+    def elegir_columna(self, tablero: List[List[str]]) -> int:
+        """Dado un tablero sin ganador y no completo, devuelve la columna en la
+        que conviene insertar el próximo símbolo. El valor de la posición para
+        el jugador que mueve queda en el atributo `valor`."""
+        # La búsqueda inserta y deshace símbolos en una única copia del
+        # tablero; si se interrumpe, la copia queda a medio recorrer.
+        if isinstance(tablero, cuatro_en_linea.TableroBits):
+            tablero = tablero.copiar()
+        else:
+            tablero = cuatro_en_linea.TableroBits.desde_lista(tablero)
+        claves = zobrist.claves_zobrist(tablero.alto, tablero.ancho)
+        if claves is not self.claves:
+            self.evaluacion.vaciar()
+        self.claves = claves
+        self.nodos = 0
+        clave, espejo = zobrist.claves_tablero(tablero, self.claves)
+        if self.libro is not None and (self.libro.filas, self.libro.columnas) == (tablero.alto, tablero.ancho):
+            encontrado = self.libro.buscar(clave, espejo)
+            if encontrado is not None:
+                self.valor, columna = encontrado
+                return columna
+        self.tabla.nueva_busqueda()
+        self._limite = time.perf_counter() + self.tiempo
+        self.valor = 0
+        mejor = self._orden(tablero, None)[0]
+        restantes = tablero.alto * tablero.ancho - tablero.movimientos
+        for profundidad in range(1, min(self.profundidad, restantes) + 1):
+            try:
+                valor, columna = self._negamax(tablero, profundidad, -INFINITO, INFINITO, clave, espejo, 0, profundidad > 1)
+            except _TiempoAgotado:
+                break
+            mejor = columna
+            self.valor = valor
+            if abs(valor) >= VICTORIA - restantes:
+                break
+        return mejor
+
+    def _orden(self, tablero: cuatro_en_linea.TableroBits, primera: int) -> List[int]:
+        """Devuelve las columnas libres ordenadas del centro hacia los bordes,
+        empezando por `primera` si se indica."""
+        centro = (tablero.ancho - 1) / 2
+        columnas = sorted(range(tablero.ancho), key=lambda c: abs(c - centro))
+        columnas = [c for c in columnas if not tablero.columna_llena(c)]
+        if primera is not None and primera in columnas:
+            columnas.remove(primera)
+            columnas.insert(0, primera)
+        return columnas
+
+    def _negamax(self, tablero, profundidad, alfa, beta, clave, espejo, ply, con_limite):
+        """Devuelve (valor, columna) de la posición para el jugador que mueve.
+        `clave` y `espejo` son las claves Zobrist de la posición y de su
+        imagen espejo."""
+        self.nodos += 1
+        if con_limite and self.nodos & 1023 == 0 and (
+                time.perf_counter() > self._limite or (self.cancelar is not None and self.cancelar.is_set())):
+            raise _TiempoAgotado()
+        alfa_original = alfa
+        espejada = espejo < clave
+        ultima_columna = tablero.ancho - 1
+        entrada = self.tabla.buscar(espejo if espejada else clave)
+        columna_tabla = None
+        if entrada is not None:
+            columna_tabla = ultima_columna - entrada[4] if espejada else entrada[4]
+            if entrada[1] >= profundidad:
+                valor = _desde_tabla(entrada[2], ply)
+                if entrada[3] == EXACTA:
+                    return valor, columna_tabla
+                if entrada[3] == COTA_INFERIOR:
+                    alfa = max(alfa, valor)
+                else:
+                    beta = min(beta, valor)
+                if alfa >= beta:
+                    return valor, columna_tabla
+        if profundidad == 0:
+            return self.evaluacion.evaluar(espejo if espejada else clave, tablero), None
+        indice_simbolo = 0 if tablero.es_turno_de_x() else 1
+        mejor_valor = -INFINITO
+        mejor_columna = None
+        for columna in self._orden(tablero, columna_tabla):
+            altura = tablero.alturas[columna]
+            fila = cuatro_en_linea.insertar_simbolo_en_fila(tablero, columna)
+            if cuatro_en_linea.obtener_ganador_desde(tablero, fila, columna) != ' ':
+                valor = VICTORIA - ply - 1
+            elif cuatro_en_linea.tablero_completo(tablero):
+                valor = 0
+            else:
+                clave_hijo = clave ^ self.claves[columna][altura][indice_simbolo]
+                espejo_hijo = espejo ^ self.claves[ultima_columna - columna][altura][indice_simbolo]
+                valor = -self._negamax(tablero, profundidad - 1, -beta, -alfa, clave_hijo, espejo_hijo, ply + 1, con_limite)[0]
+            cuatro_en_linea.deshacer_simbolo(tablero)
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor_columna = columna
+            alfa = max(alfa, valor)
+            if alfa >= beta:
+                break
+        if mejor_valor <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor_valor >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = EXACTA
+        if espejada:
+            self.tabla.guardar(espejo, profundidad, _hacia_tabla(mejor_valor, ply), tipo, ultima_columna - mejor_columna)
+        else:
+            self.tabla.guardar(clave, profundidad, _hacia_tabla(mejor_valor, ply), tipo, mejor_columna)
+        return mejor_valor, mejor_columna
+
+
+def _hacia_tabla(valor: int, ply: int) -> int:
+    """Expresa un valor de victoria relativo a la posición y no a la raíz,
+    para que sea válido al encontrar la posición por otro camino."""
+    if valor >= VICTORIA - 1000:
+        return valor + ply
+    if valor <= -VICTORIA + 1000:
+        return valor - ply
+    return valor
+
+
+def _desde_tabla(valor: int, ply: int) -> int:
+    """Inversa de `_hacia_tabla`."""
+    if valor >= VICTORIA - 1000:
+        return valor - ply
+    if valor <= -VICTORIA + 1000:
+        return valor + ply
+    return valor
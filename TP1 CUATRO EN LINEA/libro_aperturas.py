@@ -0,0 +1,140 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, Tuple
+
+import cuatro_en_linea
+import ia
+import zobrist
+
+# Formato del archivo:
+#   encabezado: firma, versión, filas, columnas, profundidad del libro,
+#               cantidad de casillas
+#   casillas:   clave Zobrist canónica (64 bits), valor (32 bits), columna
+#               en orientación canónica (8 bits), ocupada (8 bits) y 2 bytes
+#               de relleno
+# Las casillas forman una tabla hash con sondeo lineal a partir de
+# `clave % casillas`, de modo que una búsqueda lee directamente los bytes
+# de la casilla sin interpretar el resto del archivo.
+FIRMA = b'C4LB'
+VERSION = 2
+ENCABEZADO = struct.Struct('<4sHBBBxI')
+CASILLA = struct.Struct('<QibB2x')
+
+
+def ruta_libro(n_filas: int, n_columnas: int) -> str:
+    """Devuelve la ruta por defecto del libro para un tablero de
+    n_filas por n_columnas, junto a este módulo."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'libro_{n_filas}x{n_columnas}.bin')
+
+
+class LibroAperturas:
+    """Libro de aperturas abierto con `mmap`. Abrirlo sólo lee el encabezado,
+    por lo que tarda lo mismo sin importar el tamaño del archivo, y cada
+    búsqueda lee únicamente las casillas que sondea."""
+
+    def __init__(self, ruta: str):
+        self._archivo = open(ruta, 'rb')
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        firma, version, self.filas, self.columnas, self.profundidad, self.casillas = ENCABEZADO.unpack_from(self._mapa, 0)
+        if firma != FIRMA or version != VERSION:
+            self.cerrar()
+            raise ValueError(f'{ruta} no es un libro de aperturas valido')
+
+    def buscar(self, clave: int, espejo: int) -> Tuple[int, int]:
+        """Dadas las claves Zobrist de una posición y de su imagen espejo,
+        devuelve (valor, columna) de la posición, o None si no está en el
+        libro."""
+        canonica = zobrist.clave_canonica(clave, espejo)
+        indice = canonica % self.casillas
+        while True:
+            guardada, valor, columna, ocupada = CASILLA.unpack_from(self._mapa, ENCABEZADO.size + indice * CASILLA.size)
+            if not ocupada:
+                return None
+            if guardada == canonica:
+                if espejo < clave:
+                    columna = zobrist.espejar_columna(columna, self.columnas)
+                return valor, columna
+            indice = (indice + 1) % self.casillas
+
+    def cerrar(self) -> None:
+        self._mapa.close()
+        self._archivo.close()
+
+
+def abrir_libro(n_filas: int, n_columnas: int) -> LibroAperturas:
+    """Abre el libro por defecto para el tamaño de tablero dado, o devuelve
+    None si no fue generado."""
+    ruta = ruta_libro(n_filas, n_columnas)
+    if not os.path.exists(ruta):
+        return None
+    return LibroAperturas(ruta)
+
+
+def escribir_libro(ruta: str, n_filas: int, n_columnas: int, profundidad: int, posiciones: Dict[int, Tuple[int, int]]) -> None:
+    """Escribe un libro con las posiciones dadas (clave canónica ->
+    (valor, columna en orientación canónica)).
+    La tabla tiene al menos el doble de casillas que posiciones para que los
+    sondeos sean cortos."""
+    casillas = 1
+    while casillas < 2 * len(posiciones) + 1:
+        casillas *= 2
+    tabla = bytearray(ENCABEZADO.size + casillas * CASILLA.size)
+    ENCABEZADO.pack_into(tabla, 0, FIRMA, VERSION, n_filas, n_columnas, profundidad, casillas)
+    for clave, (valor, columna) in posiciones.items():
+        indice = clave % casillas
+        while tabla[ENCABEZADO.size + indice * CASILLA.size + 13]:
+            indice = (indice + 1) % casillas
+        CASILLA.pack_into(tabla, ENCABEZADO.size + indice * CASILLA.size, clave, valor, columna, 1)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(tabla)
+
+
+def generar_posiciones(n_filas: int, n_columnas: int, profundidad: int, profundidad_busqueda: int) -> Dict[int, Tuple[int, int]]:
+    """Evalúa con `ia.JugadorIA` todas las posiciones sin ganador alcanzables
+    con hasta `profundidad` símbolos insertados, y devuelve para cada clave
+    Zobrist canónica su valor y su mejor columna en orientación canónica.
+    Las posiciones simétricas se evalúan una sola vez."""
+    jugador = ia.JugadorIA(profundidad_busqueda, tiempo=float('inf'))
+    posiciones = {}
+    nivel = {0: (zobrist.HashPosicion(n_filas, n_columnas), cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True))}
+    for jugadas in range(profundidad + 1):
+        siguiente = {}
+        inicio = time.perf_counter()
+        for clave, (hash_posicion, tablero) in nivel.items():
+            columna = jugador.elegir_columna(tablero)
+            posiciones[clave] = (jugador.valor, hash_posicion.a_canonica(columna))
+            if jugadas == profundidad:
+                continue
+            for c in range(n_columnas):
+                if tablero.columna_llena(c):
+                    continue
+                hijo = tablero.copiar()
+                hash_hijo = hash_posicion.copiar()
+                hash_hijo.alternar(c, hijo.alturas[c], hijo.es_turno_de_x())
+                fila = cuatro_en_linea.insertar_simbolo_en_fila(hijo, c)
+                if cuatro_en_linea.obtener_ganador_desde(hijo, fila, c) != ' ' or hijo.completo():
+                    continue
+                siguiente[hash_hijo.canonica()] = (hash_hijo, hijo)
+        print(f'{jugadas} jugadas: {len(nivel)} posiciones en {time.perf_counter() - inicio:.1f} s')
+        nivel = siguiente
+    return posiciones
+
+
+def main():
+    """Genera un libro de aperturas.
+    Uso: python libro_aperturas.py filas columnas profundidad_libro profundidad_busqueda [ruta]"""
+    if len(sys.argv) < 5:
+        print(main.__doc__)
+        return
+    n_filas, n_columnas, profundidad, profundidad_busqueda = [int(a) for a in sys.argv[1:5]]
+    ruta = sys.argv[5] if len(sys.argv) > 5 else ruta_libro(n_filas, n_columnas)
+    posiciones = generar_posiciones(n_filas, n_columnas, profundidad, profundidad_busqueda)
+    escribir_libro(ruta, n_filas, n_columnas, profundidad, posiciones)
+    print(f'{len(posiciones)} posiciones guardadas en {ruta} ({os.path.getsize(ruta)} bytes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+from typing import List
+
+import numpy as np
+
+import cuatro_en_linea
+
+VACIO = 0
+X = 1
+O = 2
+
+SIMBOLOS = (' ', 'X', 'O')
+
+
+class LoteTableros:
+    """Conjunto de N tableros de cuatro en línea de las mismas dimensiones
+    que se juegan en simultáneo con operaciones vectorizadas de NumPy.
+
+    Las celdas se guardan en un arreglo `celdas` de forma (N, filas, columnas)
+    con la misma orientación que `crear_tablero` (la fila 0 es la de arriba),
+    usando VACIO, X y O como valores. Además se guardan la altura de cada
+    columna y la cantidad de símbolos de cada tablero, para insertar sin
+    recorrer las columnas.
+    """
+
+    def __init__(self, n_tableros: int, n_filas: int, n_columnas: int):
+        self.filas = n_filas
+        self.columnas = n_columnas
+        self.celdas = np.zeros((n_tableros, n_filas, n_columnas), dtype=np.int8)
+        self.alturas = np.zeros((n_tableros, n_columnas), dtype=np.int16)
+        self.movimientos = np.zeros(n_tableros, dtype=np.int16)
+        self._indices = np.arange(n_tableros)
+
+    def __len__(self) -> int:
+        return len(self.celdas)
+
+    @classmethod
+    def desde_tableros(cls, tableros: List[List[List[str]]]) -> 'LoteTableros':
+        """Dada una lista de tableros de `crear_tablero` con las mismas
+        dimensiones, devuelve el lote equivalente."""
+        lote = cls(len(tableros), len(tableros[0]), len(tableros[0][0]))
+        codigos = {' ': VACIO, 'X': X, 'O': O}
+        for i, tablero in enumerate(tableros):
+            for f in range(lote.filas):
+                for c in range(lote.columnas):
+                    lote.celdas[i, f, c] = codigos[tablero[f][c]]
+        ocupadas = lote.celdas != VACIO
+        lote.alturas[:] = ocupadas.sum(axis=1)
+        lote.movimientos[:] = ocupadas.sum(axis=(1, 2))
+        return lote
+
+    def a_tableros(self) -> List[List[List[str]]]:
+        """Devuelve los tableros del lote en el formato de `crear_tablero`."""
+        simbolos = np.array(SIMBOLOS)
+        return simbolos[self.celdas].tolist()
+
+    def es_turno_de_x(self) -> np.ndarray:
+        """Devuelve, para cada tablero, si el próximo símbolo es X."""
+        return self.movimientos % 2 == 0
+
+    def tableros_completos(self) -> np.ndarray:
+        """Devuelve, para cada tablero, si ya no admite más símbolos."""
+        return self.movimientos == self.filas * self.columnas
+
+    def insertar(self, columnas: np.ndarray, activos: np.ndarray = None) -> np.ndarray:
+        """Inserta en cada tablero el símbolo de su turno en la columna
+        correspondiente de `columnas`, igual que `insertar_simbolo`.
+        Si se indica `activos`, sólo se juega en los tableros marcados.
+        Devuelve, para cada tablero, si se insertó el símbolo."""
+        columnas = np.asarray(columnas)
+        validas = (columnas >= 0) & (columnas < self.columnas)
+        if activos is not None:
+            validas &= activos
+        columnas_seguras = np.where(validas, columnas, 0)
+        alturas = self.alturas[self._indices, columnas_seguras]
+        validas &= alturas < self.filas
+        tableros = self._indices[validas]
+        columnas_validas = columnas_seguras[validas]
+        filas = self.filas - 1 - alturas[validas]
+        simbolos = np.where(self.movimientos[validas] % 2 == 0, X, O)
+        self.celdas[tableros, filas, columnas_validas] = simbolos
+        self.alturas[tableros, columnas_validas] += 1
+        self.movimientos[tableros] += 1
+        return validas
+
+    def columnas_aleatorias(self, generador: np.random.Generator) -> np.ndarray:
+        """Devuelve una columna libre elegida al azar para cada tablero
+        (0 en los tableros completos)."""
+        puntajes = generador.random((len(self), self.columnas))
+        puntajes[self.alturas >= self.filas] = -1.0
+        return puntajes.argmax(axis=1)
+
+    def ganadores(self) -> np.ndarray:
+        """Devuelve, para cada tablero, el código del símbolo ganador (X u O)
+        o VACIO si no hay ganador.
+
+        Se evalúan todas las ventanas de cuatro celdas a la vez comparando
+        cuatro vistas desplazadas del arreglo, en las mismas direcciones y el
+        mismo orden que `verificar_ganador_horizontal`, `_vertical`,
+        `_diagonal` y `_diagonal_inversa`, de modo que el resultado coincide
+        con `obtener_ganador` incluso cuando ambos símbolos tienen un cuatro
+        en línea.
+        """
+        t = self.celdas
+        # Cada dirección se ordena como la recorre su función de referencia:
+        # horizontal y vertical por columna y luego fila, las diagonales por
+        # fila y luego columna.
+        direcciones = (
+            (t[:, :, :-3], t[:, :, 1:-2], t[:, :, 2:-1], t[:, :, 3:], True),
+            (t[:, :-3, :], t[:, 1:-2, :], t[:, 2:-1, :], t[:, 3:, :], True),
+            (t[:, :-3, :-3], t[:, 1:-2, 1:-2], t[:, 2:-1, 2:-1], t[:, 3:, 3:], False),
+            (t[:, :-3, 3:], t[:, 1:-2, 2:-1], t[:, 2:-1, 1:-2], t[:, 3:, :-3], False),
+        )
+        ganadores = np.zeros(len(self), dtype=np.int8)
+        for a, b, c, d, por_columna in direcciones:
+            ventanas = np.where((a == b) & (a == c) & (a == d), a, VACIO)
+            if por_columna:
+                ventanas = ventanas.transpose(0, 2, 1)
+            ventanas = ventanas.reshape(len(self), -1)
+            if ventanas.shape[1] == 0:
+                continue
+            primera = (ventanas != VACIO).argmax(axis=1)
+            encontrados = ventanas[self._indices, primera]
+            ganadores = np.where(ganadores == VACIO, encontrados, ganadores)
+        return ganadores
+
+    def ganadores_simbolos(self) -> List[str]:
+        """Igual que `ganadores`, pero con los símbolos de `obtener_ganador`."""
+        return [SIMBOLOS[codigo] for codigo in self.ganadores()]
+
+
+def coincide_con_referencia(lote: LoteTableros) -> bool:
+    """Devuelve True si `ganadores` coincide con `obtener_ganador` en todos
+    los tableros del lote."""
+    ganadores = lote.ganadores_simbolos()
+    for tablero, ganador in zip(lote.a_tableros(), ganadores):
+        if cuatro_en_linea.obtener_ganador(tablero) != ganador:
+            return False
+    return True
@@ -1,9 +1,23 @@
 import cuatro_en_linea
+import ia
+import libro_aperturas
+import reflexion
 
 
 def main():
     ancho, alto = cuatro_en_linea.dimensiones_tablero()
-    tablero = cuatro_en_linea.crear_tablero(alto, ancho)
-    cuatro_en_linea.jugar(tablero)
+    tablero = cuatro_en_linea.crear_tablero(alto, ancho, bits=True)
+    dificultad = cuatro_en_linea.elegir_oponente(list(ia.DIFICULTADES))
+    oponente = None
+    if dificultad is not None:
+        oponente = ia.JugadorIA.con_dificultad(dificultad)
+        oponente.libro = libro_aperturas.abrir_libro(alto, ancho)
+    pensador = None
+    if cuatro_en_linea.elegir_pistas():
+        if oponente is not None:
+            pensador = reflexion.Reflexion(oponente)
+        else:
+            pensador = reflexion.Reflexion(ia.JugadorIA.con_dificultad('media'), responder=False)
+    cuatro_en_linea.jugar(tablero, oponente, pensador)
     
 main()
\ No newline at end of file
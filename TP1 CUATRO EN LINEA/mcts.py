@@ -0,0 +1,194 @@
+import math
+import multiprocessing
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import cuatro_en_linea
+
+
+class _Nodo:
+    """Nodo del árbol de búsqueda. `valor` acumula los resultados de las
+    simulaciones desde el punto de vista del jugador que hizo la jugada que
+    lleva a este nodo: 1 por victoria y 0.5 por empate."""
+
+    __slots__ = ('columna', 'padre', 'hijos', 'sin_probar', 'visitas', 'valor', 'terminal')
+
+    def __init__(self, columna: int, padre: '_Nodo', sin_probar: List[int], terminal: bool):
+        self.columna = columna
+        self.padre = padre
+        self.hijos = []
+        self.sin_probar = sin_probar
+        self.visitas = 0
+        self.valor = 0.0
+        self.terminal = terminal
+
+    def elegir_hijo(self, exploracion: float) -> '_Nodo':
+        """Devuelve el hijo que maximiza la fórmula UCT."""
+        log_visitas = math.log(self.visitas)
+        mejor = None
+        mejor_puntaje = -1.0
+        for hijo in self.hijos:
+            puntaje = hijo.valor / hijo.visitas + exploracion * math.sqrt(log_visitas / hijo.visitas)
+            if puntaje > mejor_puntaje:
+                mejor = hijo
+                mejor_puntaje = puntaje
+        return mejor
+
+
+def _jugar(mascaras: List[int], alturas: List[int], alto: int, turno: int, columna: int) -> bool:
+    """Inserta en la columna el símbolo de `turno` (0 para X, 1 para O) sobre
+    las máscaras y alturas de un `TableroBits`, con la misma disposición de
+    bits. Devuelve True si la jugada forma un cuatro en línea."""
+    mascaras[turno] |= 1 << (columna * (alto + 1) + alturas[columna])
+    alturas[columna] += 1
+    return cuatro_en_linea.hay_cuatro_en_linea(mascaras[turno], alto)
+
+
+def _libres(alturas: List[int], alto: int) -> List[int]:
+    return [c for c in range(len(alturas)) if alturas[c] < alto]
+
+
+def _buscar(argumentos: Tuple) -> Tuple[Dict[int, Tuple[int, float]], int]:
+    """Corre `playouts` iteraciones de UCT desde la posición recibida y
+    devuelve, para cada columna de la raíz, sus visitas y su valor acumulado,
+    junto con la cantidad de simulaciones realizadas. Es la unidad de trabajo
+    de cada proceso en la paralelización de raíz."""
+    bits_x, bits_o, alturas_raiz, movimientos_raiz, alto, playouts, semilla, exploracion = argumentos
+    generador = random.Random(semilla)
+    total = alto * len(alturas_raiz)
+    raiz = _Nodo(None, None, _libres(alturas_raiz, alto), False)
+    for _ in range(playouts):
+        nodo = raiz
+        mascaras = [bits_x, bits_o]
+        alturas = alturas_raiz[:]
+        movimientos = movimientos_raiz
+        ganada = False
+        # Selección
+        while not nodo.sin_probar and nodo.hijos and not nodo.terminal:
+            nodo = nodo.elegir_hijo(exploracion)
+            ganada = _jugar(mascaras, alturas, alto, movimientos % 2, nodo.columna)
+            movimientos += 1
+        # Expansión
+        if nodo.sin_probar and not nodo.terminal:
+            columna = nodo.sin_probar.pop(generador.randrange(len(nodo.sin_probar)))
+            ganada = _jugar(mascaras, alturas, alto, movimientos % 2, columna)
+            movimientos += 1
+            terminal = ganada or movimientos == total
+            hijo = _Nodo(columna, nodo, [] if terminal else _libres(alturas, alto), terminal)
+            nodo.hijos.append(hijo)
+            nodo = hijo
+        # Simulación: `resultado` es el puntaje para quien hizo la última
+        # jugada del árbol (la que lleva a `nodo`).
+        if ganada:
+            resultado = 1.0
+        else:
+            ultimo = (movimientos - 1) % 2
+            resultado = 0.5
+            while movimientos < total:
+                turno = movimientos % 2
+                columna = generador.choice(_libres(alturas, alto))
+                movimientos += 1
+                if _jugar(mascaras, alturas, alto, turno, columna):
+                    resultado = 1.0 if turno == ultimo else 0.0
+                    break
+        # Retropropagación
+        while nodo is not None:
+            nodo.visitas += 1
+            nodo.valor += resultado
+            resultado = 1.0 - resultado
+            nodo = nodo.padre
+    estadisticas = {hijo.columna: (hijo.visitas, hijo.valor) for hijo in raiz.hijos}
+    return estadisticas, playouts
+
+
+class JugadorMCTS:
+    """Oponente que elige columnas con Monte Carlo Tree Search (UCT).
+
+    Las simulaciones se reparten entre `procesos` procesos con paralelización
+    de raíz: cada proceso construye su propio árbol desde la posición actual
+    con una semilla distinta, y al final se suman las visitas y los valores de
+    cada columna de la raíz de todos los árboles. Se juega la columna más
+    visitada. El pool de procesos se crea en la primera jugada y se reutiliza
+    en las siguientes; `cerrar` lo termina.
+
+    Las simulaciones trabajan directamente sobre las máscaras de bits de
+    `TableroBits` y detectan los cuatro en línea con
+    `cuatro_en_linea.hay_cuatro_en_linea`, por lo que dan los mismos
+    resultados que `insertar_simbolo` y `obtener_ganador`.
+    """
+
+    def __init__(self, playouts: int = 20000, procesos: int = None, exploracion: float = math.sqrt(2), semilla: int = None):
+        self.playouts = playouts
+        self.procesos = procesos or multiprocessing.cpu_count()
+        self.exploracion = exploracion
+        self.generador = random.Random(semilla)
+        self.estadisticas = {}
+        self.playouts_por_segundo = 0.0
+        self._pool = None
+
+    def elegir_columna(self, tablero: List[List[str]]) -> int:
+        """Dado un tablero sin ganador y no completo, devuelve la columna en la
+        que conviene insertar el próximo símbolo. Luego de llamarla,
+        `estadisticas` tiene las visitas y el valor de cada columna y
+        `playouts_por_segundo` la velocidad de la búsqueda. Si no se hizo
+        ninguna simulación devuelve la columna libre más cercana al centro."""
+        if not isinstance(tablero, cuatro_en_linea.TableroBits):
+            tablero = cuatro_en_linea.TableroBits.desde_lista(tablero)
+        procesos = max(1, min(self.procesos, self.playouts))
+        tareas = []
+        for i in range(procesos):
+            playouts = self.playouts // procesos + (1 if i < self.playouts % procesos else 0)
+            tareas.append((tablero.bits_x, tablero.bits_o, tablero.alturas[:], tablero.movimientos,
+                           tablero.alto, playouts, self.generador.getrandbits(32), self.exploracion))
+        inicio = time.perf_counter()
+        if procesos == 1:
+            resultados = [_buscar(tareas[0])]
+        else:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(procesos)
+            resultados = self._pool.map(_buscar, tareas)
+        duracion = time.perf_counter() - inicio
+        self.estadisticas = {}
+        realizados = 0
+        for estadisticas, playouts in resultados:
+            realizados += playouts
+            for columna, (visitas, valor) in estadisticas.items():
+                visitas_total, valor_total = self.estadisticas.get(columna, (0, 0.0))
+                self.estadisticas[columna] = (visitas_total + visitas, valor_total + valor)
+        self.playouts_por_segundo = realizados / duracion if duracion > 0 else 0.0
+        if not self.estadisticas:
+            centro = (tablero.ancho - 1) / 2
+            return min(_libres(tablero.alturas, tablero.alto), key=lambda c: abs(c - centro))
+        return max(self.estadisticas, key=lambda c: self.estadisticas[c][0])
+
+    def cerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'JugadorMCTS':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+
+def main():
+    """Mide la velocidad de la búsqueda en un tablero vacío.
+    Uso: python mcts.py [playouts] [procesos] [filas] [columnas]"""
+    argumentos = [int(a) for a in sys.argv[1:]]
+    playouts, procesos, filas, columnas = argumentos + [20000, multiprocessing.cpu_count(), 10, 10][len(argumentos):]
+    with JugadorMCTS(playouts, procesos) as jugador:
+        columna = jugador.elegir_columna(cuatro_en_linea.crear_tablero(filas, columnas, bits=True))
+    print(f'Tablero {filas}x{columnas}, {procesos} procesos: columna {columna}')
+    print(f'{jugador.playouts_por_segundo:.0f} playouts por segundo')
+    for c in sorted(jugador.estadisticas):
+        visitas, valor = jugador.estadisticas[c]
+        print(f'  columna {c}: {visitas} visitas, {valor / visitas:.3f} de valor medio')
+
+
+if __name__ == '__main__':
+    main()
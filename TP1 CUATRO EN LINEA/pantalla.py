@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+from typing import List, TextIO
+
+import cuatro_en_linea
+import registro_partidas
+
+# Secuencias ANSI
+BORRAR_PANTALLA = '\x1b[2J\x1b[H'
+BORRAR_LINEA = '\x1b[2K'
+OCULTAR_CURSOR = '\x1b[?25l'
+MOSTRAR_CURSOR = '\x1b[?25h'
+
+# Líneas que ocupa `formatear_tablero` antes de la primera fila.
+LINEAS_ENCABEZADO = 4
+
+
+def _mover_cursor(linea: int, columna: int) -> str:
+    """Devuelve la secuencia que lleva el cursor a la línea y columna dadas,
+    contadas desde 0."""
+    return f'\x1b[{linea + 1};{columna + 1}H'
+
+
+class Pantalla:
+    """Dibuja un tablero, con líneas de estado debajo, armando cada cuadro
+    en un solo texto que se escribe de una vez.
+
+    Con `en_lugar` el primer cuadro borra la pantalla y dibuja todo, y los
+    siguientes usan secuencias ANSI para mover el cursor y reescribir sólo
+    las celdas que cambiaron y las líneas de estado distintas. Sin
+    `en_lugar` cada cuadro se escribe completo a continuación del anterior,
+    como `imprimir_tablero`.
+    """
+
+    def __init__(self, salida: TextIO = None, en_lugar: bool = True):
+        self.salida = salida if salida is not None else sys.stdout
+        self.en_lugar = en_lugar
+        self.cuadros = 0
+        self._celdas = None
+        self._estado = []
+
+    def dibujar(self, tablero: List[List[str]], *estado: str) -> None:
+        """Dibuja el tablero y las líneas de estado recibidas."""
+        if not self.en_lugar:
+            self._escribir(cuatro_en_linea.formatear_tablero(tablero) + ''.join(linea + '\n' for linea in estado))
+            return
+        celdas = [list(fila) for fila in tablero]
+        if self._celdas is None or len(celdas) != len(self._celdas) or len(celdas[0]) != len(self._celdas[0]):
+            self._celdas = celdas
+            self._estado = list(estado)
+            texto = cuatro_en_linea.formatear_tablero(tablero) + ''.join(linea + '\n' for linea in estado)
+            self._escribir(OCULTAR_CURSOR + BORRAR_PANTALLA + texto)
+            return
+        partes = []
+        for f, fila in enumerate(celdas):
+            anterior = self._celdas[f]
+            for c, simbolo in enumerate(fila):
+                if simbolo != anterior[c]:
+                    partes.append(_mover_cursor(LINEAS_ENCABEZADO + f, 4 * c) + simbolo)
+        primera_linea_estado = LINEAS_ENCABEZADO + len(celdas) + 1
+        for i in range(max(len(estado), len(self._estado))):
+            linea = estado[i] if i < len(estado) else ''
+            if i >= len(self._estado) or linea != self._estado[i]:
+                partes.append(_mover_cursor(primera_linea_estado + i, 0) + BORRAR_LINEA + linea)
+        self._celdas = celdas
+        self._estado = list(estado)
+        partes.append(_mover_cursor(primera_linea_estado + len(self._estado), 0))
+        self._escribir(''.join(partes))
+
+    def terminar(self) -> None:
+        """Deja el cursor visible y debajo del último cuadro."""
+        if self.en_lugar and self._celdas is not None:
+            self.salida.write(MOSTRAR_CURSOR)
+            self.salida.flush()
+        self._celdas = None
+        self._estado = []
+
+    def _escribir(self, texto: str) -> None:
+        self.salida.write(texto)
+        self.salida.flush()
+        self.cuadros += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce en la terminal las partidas de un registro.')
+    parser.add_argument('registro', help='archivo de partidas (ver registro_partidas.py)')
+    parser.add_argument('--pausa', type=float, default=0.0, help='segundos entre cuadros')
+    parser.add_argument('--completo', action='store_true', help='redibujar el tablero completo en cada cuadro')
+    parser.add_argument('--partidas', type=int, help='cantidad maxima de partidas a reproducir')
+    args = parser.parse_args()
+
+    pantalla = Pantalla(en_lugar=not args.completo)
+    inicio = time.perf_counter()
+    try:
+        for numero, (n_filas, n_columnas, jugadas) in enumerate(registro_partidas.leer_partidas(args.registro), 1):
+            if args.partidas is not None and numero > args.partidas:
+                break
+            tablero = cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True)
+            pantalla.dibujar(tablero, f'Partida {numero}', f'Jugada 0 de {len(jugadas)}')
+            for i, columna in enumerate(jugadas, 1):
+                simbolo = 'X' if cuatro_en_linea.es_turno_de_x(tablero) else 'O'
+                cuatro_en_linea.insertar_simbolo(tablero, columna)
+                pantalla.dibujar(tablero, f'Partida {numero}', f'Jugada {i} de {len(jugadas)}: {simbolo} en la columna {columna}')
+                if args.pausa:
+                    time.sleep(args.pausa)
+    finally:
+        pantalla.terminar()
+    duracion = time.perf_counter() - inicio
+    print(f'{pantalla.cuadros} cuadros en {duracion:.2f} s ({pantalla.cuadros / duracion:.0f} cuadros/s)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
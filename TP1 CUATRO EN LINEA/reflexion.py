@@ -0,0 +1,110 @@
+import threading
+from typing import Dict, List
+
+import cuatro_en_linea
+import ia
+
+
+class Reflexion:
+    """Aprovecha el tiempo en que el usuario piensa su jugada para buscar en
+    un hilo aparte (la espera de `input` libera el intérprete):
+
+    1. la mejor columna para el jugador que mueve, que se muestra como pista;
+    2. si `responder` es True, la respuesta de `jugador` a cada jugada
+       posible del usuario, empezando por la de la pista y siguiendo del
+       centro hacia los bordes.
+
+    Después de la jugada del usuario, `respuesta` devuelve al instante la
+    columna ya calculada, si se llegó a calcular. Como `jugador` no se puede
+    usar desde dos hilos a la vez, hay que llamar a `detener` antes de
+    usarlo por fuera de esta clase.
+    """
+
+    def __init__(self, jugador: ia.JugadorIA, responder: bool = True):
+        self.jugador = jugador
+        self.responder = responder
+        self._tablero = None
+        self._pista = None
+        self._respuestas: Dict[int, int] = {}
+        self._hilo = None
+        self._cancelar = threading.Event()
+
+    def empezar(self, tablero: List[List[str]]) -> None:
+        """Empieza a buscar en segundo plano para la posición del tablero. Si
+        ya se estaba buscando para la misma posición, sigue con lo hecho."""
+        if isinstance(tablero, cuatro_en_linea.TableroBits):
+            copia = tablero.copiar()
+        else:
+            copia = cuatro_en_linea.TableroBits.desde_lista(tablero)
+        if self._tablero is not None and (copia.bits_x, copia.bits_o) == (self._tablero.bits_x, self._tablero.bits_o):
+            if self._hilo is None:
+                self._lanzar()
+            return
+        self.detener()
+        self._tablero = copia
+        self._pista = None
+        self._respuestas = {}
+        self._lanzar()
+
+    def detener(self) -> None:
+        """Interrumpe la búsqueda en segundo plano y espera a que termine.
+        Lo calculado hasta el momento se conserva."""
+        if self._hilo is None:
+            return
+        self._cancelar.set()
+        self._hilo.join()
+        self._hilo = None
+        self.jugador.cancelar = None
+
+    def pista(self) -> int:
+        """Devuelve la mejor columna para el jugador que mueve. Si todavía no
+        se calculó, la busca en el momento y después retoma la búsqueda en
+        segundo plano."""
+        if self._pista is None:
+            self.detener()
+            self._pista = self.jugador.elegir_columna(self._tablero.copiar())
+            self._lanzar()
+        return self._pista
+
+    def respuesta(self, columna: int) -> int:
+        """Devuelve la respuesta calculada a la jugada del usuario en
+        `columna`, o None si no se llegó a calcular."""
+        self.detener()
+        return self._respuestas.get(columna)
+
+    def _lanzar(self) -> None:
+        self._cancelar.clear()
+        self.jugador.cancelar = self._cancelar
+        self._hilo = threading.Thread(target=self._reflexionar, daemon=True)
+        self._hilo.start()
+
+    def _buscar(self, tablero: cuatro_en_linea.TableroBits) -> int:
+        """Busca la mejor columna, o devuelve None si se interrumpió."""
+        columna = self.jugador.elegir_columna(tablero)
+        return None if self._cancelar.is_set() else columna
+
+    def _columnas(self) -> List[int]:
+        centro = (self._tablero.ancho - 1) / 2
+        columnas = sorted(range(self._tablero.ancho), key=lambda c: abs(c - centro))
+        if self._pista in columnas:
+            columnas.remove(self._pista)
+            columnas.insert(0, self._pista)
+        return [c for c in columnas if not self._tablero.columna_llena(c)]
+
+    def _reflexionar(self) -> None:
+        if self._pista is None:
+            self._pista = self._buscar(self._tablero.copiar())
+        if not self.responder:
+            return
+        for columna in self._columnas():
+            if self._cancelar.is_set():
+                return
+            if columna in self._respuestas:
+                continue
+            hijo = self._tablero.copiar()
+            fila = cuatro_en_linea.insertar_simbolo_en_fila(hijo, columna)
+            if cuatro_en_linea.obtener_ganador_desde(hijo, fila, columna) != ' ' or cuatro_en_linea.tablero_completo(hijo):
+                continue
+            respuesta = self._buscar(hijo)
+            if respuesta is not None:
+                self._respuestas[columna] = respuesta
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import cuatro_en_linea
+import zobrist
+
+# Formato del archivo: la firma seguida de los registros de las partidas,
+# uno detrás de otro. Cada registro tiene:
+#   - 1 byte con (filas - 4) en los 4 bits altos y (columnas - 4) en los bajos
+#   - 1 byte con la cantidad de jugadas
+#   - las columnas jugadas, en orden, con `bits_por_jugada(columnas)` bits
+#     cada una, empaquetadas desde el bit menos significativo
+# Los registros sólo se agregan al final, por lo que un archivo se puede
+# seguir escribiendo en distintas sesiones.
+FIRMA = b'C4RG\x01'
+TAMANIO_BLOQUE = 1 << 20
+
+Partida = Tuple[int, int, List[int]]
+
+
+def bits_por_jugada(n_columnas: int) -> int:
+    """Devuelve cuántos bits hacen falta para guardar una columna."""
+    return (n_columnas - 1).bit_length()
+
+
+def codificar_partida(n_filas: int, n_columnas: int, jugadas: List[int]) -> bytes:
+    """Devuelve el registro binario de una partida."""
+    bits = bits_por_jugada(n_columnas)
+    empaquetadas = 0
+    for i, columna in enumerate(jugadas):
+        empaquetadas |= columna << (i * bits)
+    largo = (len(jugadas) * bits + 7) // 8
+    return bytes(((n_filas - 4) << 4 | (n_columnas - 4), len(jugadas))) + empaquetadas.to_bytes(largo, 'little')
+
+
+class EscritorRegistro:
+    """Agrega partidas al final de un archivo de registro."""
+
+    def __init__(self, ruta: str):
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        self._archivo = open(ruta, 'ab')
+        if nuevo:
+            self._archivo.write(FIRMA)
+
+    def agregar(self, n_filas: int, n_columnas: int, jugadas: List[int]) -> None:
+        self._archivo.write(codificar_partida(n_filas, n_columnas, jugadas))
+
+    def escribir_registros(self, registros: bytes) -> None:
+        """Agrega registros ya codificados con `codificar_partida`."""
+        self._archivo.write(registros)
+
+    def cerrar(self) -> None:
+        self._archivo.close()
+
+    def __enter__(self) -> 'EscritorRegistro':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.cerrar()
+
+
+def leer_partidas(ruta: str) -> Iterator[Partida]:
+    """Recorre las partidas de un archivo de registro sin cargarlo entero:
+    lee bloques de `TAMANIO_BLOQUE` bytes y devuelve cada partida como
+    (filas, columnas, jugadas)."""
+    with open(ruta, 'rb') as archivo:
+        if archivo.read(len(FIRMA)) != FIRMA:
+            raise ValueError(f'{ruta} no es un registro de partidas valido')
+        pendiente = b''
+        while True:
+            bloque = archivo.read(TAMANIO_BLOQUE)
+            if not bloque:
+                break
+            datos = pendiente + bloque
+            posicion = 0
+            while posicion + 2 <= len(datos):
+                dimensiones = datos[posicion]
+                n_jugadas = datos[posicion + 1]
+                n_columnas = (dimensiones & 0x0F) + 4
+                bits = bits_por_jugada(n_columnas)
+                fin = posicion + 2 + (n_jugadas * bits + 7) // 8
+                if fin > len(datos):
+                    break
+                empaquetadas = int.from_bytes(datos[posicion + 2:fin], 'little')
+                mascara = (1 << bits) - 1
+                jugadas = [(empaquetadas >> (i * bits)) & mascara for i in range(n_jugadas)]
+                yield (dimensiones >> 4) + 4, n_columnas, jugadas
+                posicion = fin
+            pendiente = datos[posicion:]
+        if pendiente:
+            raise ValueError(f'{ruta} termina con un registro incompleto')
+
+
+def analizar(partidas: Iterator[Partida]) -> Dict:
+    """Reproduce cada partida con `insertar_simbolo` y acumula estadísticas:
+    frecuencia de cada apertura (primera columna), largo promedio, resultados
+    según la primera columna y cantidad de posiciones finales distintas,
+    contando una sola vez cada posición y su imagen espejo."""
+    aperturas = {}
+    resultados_por_apertura = {}
+    finales = set()
+    cantidad = 0
+    total_jugadas = 0
+    for n_filas, n_columnas, jugadas in partidas:
+        tablero = cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True)
+        hash_posicion = zobrist.HashPosicion(n_filas, n_columnas)
+        ganador = ' '
+        for columna in jugadas:
+            fila = cuatro_en_linea.insertar_simbolo_en_fila(tablero, columna)
+            if fila is None:
+                raise ValueError(f'jugada invalida en la partida {cantidad}: columna {columna}')
+            hash_posicion.alternar(columna, tablero.alturas[columna] - 1, not tablero.es_turno_de_x())
+            ganador = cuatro_en_linea.obtener_ganador_desde(tablero, fila, columna)
+            if ganador != ' ':
+                break
+        cantidad += 1
+        total_jugadas += len(jugadas)
+        finales.add((n_filas, n_columnas, hash_posicion.canonica()))
+        if jugadas:
+            apertura = (n_filas, n_columnas, jugadas[0])
+            aperturas[apertura] = aperturas.get(apertura, 0) + 1
+            resultados = resultados_por_apertura.setdefault(apertura, {'X': 0, 'O': 0, ' ': 0})
+            resultados[ganador] += 1
+    return {
+        'partidas': cantidad,
+        'largo_promedio': total_jugadas / cantidad if cantidad else 0.0,
+        'aperturas': aperturas,
+        'resultados_por_apertura': resultados_por_apertura,
+        'finales_distintos': len(finales),
+    }
+
+
+def main():
+    """Analiza un registro de partidas.
+    Uso: python registro_partidas.py archivo"""
+    if len(sys.argv) != 2:
+        print(main.__doc__)
+        return
+    inicio = time.perf_counter()
+    estadisticas = analizar(leer_partidas(sys.argv[1]))
+    duracion = time.perf_counter() - inicio
+    partidas = estadisticas['partidas']
+    print(f'{partidas} partidas en {duracion:.2f} s ({partidas / duracion * 60:.0f} partidas/min)')
+    print(f"Largo promedio: {estadisticas['largo_promedio']:.1f} jugadas")
+    print(f"Posiciones finales distintas: {estadisticas['finales_distintos']}")
+    print()
+    print(f"{'tablero':>8} {'apertura':>9} {'partidas':>9} {'gana X':>8} {'gana O':>8} {'empate':>8}")
+    for apertura in sorted(estadisticas['aperturas']):
+        n_filas, n_columnas, columna = apertura
+        cantidad = estadisticas['aperturas'][apertura]
+        resultados = estadisticas['resultados_por_apertura'][apertura]
+        print(f"{f'{n_filas}x{n_columnas}':>8} {columna:>9} {cantidad:>9} "
+              f"{resultados['X'] / cantidad:>8.1%} {resultados['O'] / cantidad:>8.1%} {resultados[' '] / cantidad:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
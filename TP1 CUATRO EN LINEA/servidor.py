@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Dict, List
+
+import cuatro_en_linea
+
+# Protocolo: una línea de texto por mensaje, con palabras separadas por
+# espacios. Las columnas se indexan desde 0.
+#
+# Del cliente al servidor:
+#   NUEVA filas columnas   crea una partida y espera un rival; el cliente juega con X
+#   UNIRSE id              se une a la partida `id`; el cliente juega con O
+#   JUGAR columna          inserta el símbolo del cliente en la columna
+#   SALIR                  abandona la partida y cierra la conexión
+#
+# Del servidor al cliente:
+#   PARTIDA id simbolo     respuesta a NUEVA y a UNIRSE
+#   TABLERO filas          el tablero, fila por fila desde arriba, separadas
+#                          por '/', con '.' en las celdas vacías
+#   TURNO simbolo          a quién le toca jugar
+#   FIN resultado          X, O, EMPATE, ABANDONADA o INACTIVA; la partida terminó
+#   ERROR mensaje          el pedido no se pudo cumplir; la partida sigue igual
+PUERTO = 7474
+TIEMPO_INACTIVIDAD = 300.0
+
+
+class Partida:
+    """Una partida en curso: el tablero, las conexiones de cada jugador y el
+    candado que ordena las jugadas y los avisos a los jugadores."""
+
+    def __init__(self, identificador: int, n_filas: int, n_columnas: int):
+        self.identificador = identificador
+        self.tablero = cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True)
+        self.jugadores: Dict[str, asyncio.StreamWriter] = {}
+        self.candado = asyncio.Lock()
+        self.ultima_actividad = time.monotonic()
+        self.terminada = False
+
+    def turno(self) -> str:
+        return 'X' if cuatro_en_linea.es_turno_de_x(self.tablero) else 'O'
+
+    def tablero_como_texto(self) -> str:
+        return '/'.join(''.join(celda if celda != ' ' else '.' for celda in fila) for fila in self.tablero)
+
+    async def avisar(self, *lineas: str) -> None:
+        """Envía las líneas a los dos jugadores. Un jugador desconectado se
+        ignora: su lado de la conexión se encarga de cerrar la partida."""
+        mensaje = ''.join(linea + '\n' for linea in lineas).encode()
+        for escritor in list(self.jugadores.values()):
+            try:
+                escritor.write(mensaje)
+                await escritor.drain()
+            except ConnectionError:
+                pass
+
+
+class Servidor:
+    """Servidor de partidas de cuatro en línea. Mantiene en memoria todas las
+    partidas abiertas y descarta las que pasan `tiempo_inactividad` segundos
+    sin jugadas."""
+
+    def __init__(self, tiempo_inactividad: float = TIEMPO_INACTIVIDAD):
+        self.partidas: Dict[int, Partida] = {}
+        self.tiempo_inactividad = tiempo_inactividad
+        self._identificadores = itertools.count(1)
+        self.partidas_jugadas = 0
+        self.jugadas = 0
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Atiende una conexión hasta que el cliente la cierra."""
+        partida = None
+        simbolo = None
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                palabras = linea.decode(errors='replace').split()
+                if not palabras:
+                    continue
+                comando, argumentos = palabras[0].upper(), palabras[1:]
+                if comando == 'SALIR':
+                    break
+                if comando in ('NUEVA', 'UNIRSE'):
+                    if partida is not None and not partida.terminada:
+                        await _responder(escritor, 'ERROR ya estas en una partida')
+                        continue
+                    if comando == 'NUEVA':
+                        partida, error = self._crear(argumentos, escritor)
+                    else:
+                        partida, error = await self._unir(argumentos, escritor)
+                    if error:
+                        await _responder(escritor, f'ERROR {error}')
+                        continue
+                    simbolo = 'X' if comando == 'NUEVA' else 'O'
+                elif comando == 'JUGAR':
+                    error = await self._jugar(partida, simbolo, argumentos)
+                    if error:
+                        await _responder(escritor, f'ERROR {error}')
+                else:
+                    await _responder(escritor, f'ERROR comando desconocido: {comando}')
+        except ConnectionError:
+            pass
+        finally:
+            if partida is not None:
+                await self._abandonar(partida, simbolo)
+            escritor.close()
+
+    def _crear(self, argumentos: List[str], escritor: asyncio.StreamWriter):
+        try:
+            n_filas, n_columnas = (int(argumento) for argumento in argumentos)
+        except ValueError:
+            return None, 'uso: NUEVA filas columnas'
+        if not (cuatro_en_linea.validar_ancho_alto(n_filas) and cuatro_en_linea.validar_ancho_alto(n_columnas)):
+            return None, 'tamaño invalido'
+        partida = Partida(next(self._identificadores), n_filas, n_columnas)
+        partida.jugadores['X'] = escritor
+        self.partidas[partida.identificador] = partida
+        escritor.write(f'PARTIDA {partida.identificador} X\n'.encode())
+        return partida, None
+
+    async def _unir(self, argumentos: List[str], escritor: asyncio.StreamWriter):
+        try:
+            partida = self.partidas.get(int(argumentos[0]))
+        except (ValueError, IndexError):
+            return None, 'uso: UNIRSE id'
+        if partida is None:
+            return None, 'la partida no existe'
+        async with partida.candado:
+            if 'O' in partida.jugadores or partida.terminada:
+                return None, 'la partida ya tiene dos jugadores'
+            partida.jugadores['O'] = escritor
+            partida.ultima_actividad = time.monotonic()
+            escritor.write(f'PARTIDA {partida.identificador} O\n'.encode())
+            await partida.avisar(f'TABLERO {partida.tablero_como_texto()}', f'TURNO {partida.turno()}')
+        return partida, None
+
+    async def _jugar(self, partida: Partida, simbolo: str, argumentos: List[str]) -> str:
+        """Aplica una jugada y avisa el nuevo estado a los dos jugadores.
+        Devuelve un mensaje de error, o None si la jugada se hizo."""
+        if partida is None or partida.terminada:
+            return 'no estas en una partida'
+        try:
+            columna = int(argumentos[0])
+        except (ValueError, IndexError):
+            return 'uso: JUGAR columna'
+        async with partida.candado:
+            if partida.terminada:
+                return 'la partida termino'
+            if 'O' not in partida.jugadores:
+                return 'falta el rival'
+            if partida.turno() != simbolo:
+                return 'no es tu turno'
+            fila = cuatro_en_linea.insertar_simbolo_en_fila(partida.tablero, columna)
+            if fila is None:
+                return 'columna invalida o llena'
+            self.jugadas += 1
+            partida.ultima_actividad = time.monotonic()
+            ganador = cuatro_en_linea.obtener_ganador_desde(partida.tablero, fila, columna)
+            if ganador != ' ':
+                resultado = f'FIN {ganador}'
+            elif cuatro_en_linea.tablero_completo(partida.tablero):
+                resultado = 'FIN EMPATE'
+            else:
+                resultado = f'TURNO {partida.turno()}'
+            if resultado.startswith('FIN'):
+                self._cerrar(partida)
+                self.partidas_jugadas += 1
+            await partida.avisar(f'TABLERO {partida.tablero_como_texto()}', resultado)
+        return None
+
+    async def _abandonar(self, partida: Partida, simbolo: str) -> None:
+        async with partida.candado:
+            partida.jugadores.pop(simbolo, None)
+            if not partida.terminada:
+                self._cerrar(partida)
+                await partida.avisar('FIN ABANDONADA')
+
+    def _cerrar(self, partida: Partida) -> None:
+        partida.terminada = True
+        self.partidas.pop(partida.identificador, None)
+
+    async def descartar_inactivas(self) -> None:
+        """Cada cierto tiempo, cierra las partidas sin jugadas recientes."""
+        while True:
+            await asyncio.sleep(self.tiempo_inactividad / 4)
+            limite = time.monotonic() - self.tiempo_inactividad
+            for partida in [p for p in self.partidas.values() if p.ultima_actividad < limite]:
+                async with partida.candado:
+                    if not partida.terminada:
+                        self._cerrar(partida)
+                        await partida.avisar('FIN INACTIVA')
+
+    async def informar(self, intervalo: float) -> None:
+        """Muestra periódicamente las partidas abiertas y la velocidad."""
+        anteriores = 0
+        while True:
+            await asyncio.sleep(intervalo)
+            print(f'{len(self.partidas)} partidas abiertas, {self.partidas_jugadas} terminadas, '
+                  f'{(self.jugadas - anteriores) / intervalo:.0f} jugadas/s', flush=True)
+            anteriores = self.jugadas
+
+
+async def _responder(escritor: asyncio.StreamWriter, linea: str) -> None:
+    escritor.write((linea + '\n').encode())
+    await escritor.drain()
+
+
+async def servir(host: str, puerto: int, unix: str = None, tiempo_inactividad: float = TIEMPO_INACTIVIDAD,
+                 intervalo: float = 0.0) -> None:
+    servidor = Servidor(tiempo_inactividad)
+    if unix:
+        socket_servidor = await asyncio.start_unix_server(servidor.atender, path=unix)
+        print(f'Escuchando en {unix}', flush=True)
+    else:
+        socket_servidor = await asyncio.start_server(servidor.atender, host, puerto, backlog=4096)
+        print(f'Escuchando en {host}:{puerto}', flush=True)
+    tareas = [asyncio.create_task(servidor.descartar_inactivas())]
+    if intervalo > 0:
+        tareas.append(asyncio.create_task(servidor.informar(intervalo)))
+    async with socket_servidor:
+        await socket_servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de partidas de cuatro en linea.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    parser.add_argument('--unix', help='ruta de un socket Unix, en lugar de TCP')
+    parser.add_argument('--inactividad', type=float, default=TIEMPO_INACTIVIDAD,
+                        help='segundos sin jugadas tras los que se cierra una partida')
+    parser.add_argument('--informe', type=float, default=0.0, help='segundos entre informes de estado (0: nunca)')
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.unix, args.inactividad, args.informe))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
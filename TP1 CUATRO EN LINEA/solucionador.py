@@ -0,0 +1,225 @@
+import sys
+import time
+from typing import List, Tuple
+
+import cuatro_en_linea
+
+EXACTA = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+# Posiciones de `cuatro_en_linea_test.py` (tablero 5x5) para medir el
+# rendimiento: las primeras cuatro jugadas de cada prueba.
+POSICIONES_DE_PRUEBA = {
+    'test_12_obtener_ganador_horizontal': '0011',
+    'test_13_obtener_ganador_vertical': '1020',
+    'test_14_obtener_ganador_diagonal': '4332',
+    'test_15_obtener_ganador_diagonal_inversa': '0112',
+}
+
+
+class TablaAcotada:
+    """Tabla de transposición de tamaño fijo para el solucionador.
+
+    Cada posición tiene una única casilla (`clave % tamaño`). Cuando dos
+    posiciones compiten por la misma casilla se conserva la que tiene más
+    celdas libres, es decir, la que representa el subárbol más grande y más
+    caro de volver a resolver.
+    """
+
+    def __init__(self, tamanio: int = 1 << 20):
+        self.tamanio = tamanio
+        self.entradas = [None] * tamanio
+        self.consultas = 0
+        self.aciertos = 0
+
+    def buscar(self, clave: int):
+        """Devuelve (clave, valor, tipo, libres) de la posición, o None."""
+        self.consultas += 1
+        entrada = self.entradas[clave % self.tamanio]
+        if entrada is not None and entrada[0] == clave:
+            self.aciertos += 1
+            return entrada
+        return None
+
+    def guardar(self, clave: int, valor: int, tipo: int, libres: int) -> None:
+        indice = clave % self.tamanio
+        anterior = self.entradas[indice]
+        if anterior is None or anterior[0] == clave or libres >= anterior[3]:
+            self.entradas[indice] = (clave, valor, tipo, libres)
+
+    def tasa_aciertos(self) -> float:
+        return self.aciertos / self.consultas if self.consultas else 0.0
+
+
+class Solucionador:
+    """Calcula el resultado teórico de una posición suponiendo que ambos
+    jugadores juegan perfecto.
+
+    Trabaja directamente sobre las máscaras de bits de `TableroBits`: la
+    posición es la máscara del jugador que mueve y la de todas las celdas
+    ocupadas. Los valores son relativos al jugador que mueve: si gana con el
+    símbolo número `m` de la partida, el valor es `celdas + 1 - m`; si pierde,
+    el opuesto; si empata, 0. Como dependen sólo de la cantidad de símbolos
+    al final de la partida, se pueden guardar en la tabla y reutilizar al
+    llegar a la misma posición por otro camino.
+    """
+
+    def __init__(self, tamanio_tabla: int = 1 << 20):
+        self.tabla = TablaAcotada(tamanio_tabla)
+        self.nodos = 0
+        self.segundos = 0.0
+        self.alto = None
+        self.ancho = None
+
+    def resolver(self, tablero: List[List[str]]) -> Tuple[str, int, int]:
+        """Dado un tablero sin ganador y no completo, devuelve el símbolo que
+        gana con juego perfecto (' ' si es empate), la cantidad de jugadas
+        que faltan para terminar la partida y la mejor columna para el
+        jugador que mueve."""
+        if not isinstance(tablero, cuatro_en_linea.TableroBits):
+            tablero = cuatro_en_linea.TableroBits.desde_lista(tablero)
+        self._preparar(tablero.alto, tablero.ancho)
+        es_x = tablero.es_turno_de_x()
+        actual = tablero.bits_x if es_x else tablero.bits_o
+        mascara = tablero.bits_x | tablero.bits_o
+        movimientos = tablero.movimientos
+        inicio = time.perf_counter()
+        valor = self._resolver_valor(actual, mascara, movimientos)
+        columna = self._mejor_columna(actual, mascara, movimientos, valor)
+        self.segundos += time.perf_counter() - inicio
+        if valor == 0:
+            return ' ', self.celdas - movimientos, columna
+        distancia = self.celdas + 1 - abs(valor) - movimientos
+        if (valor > 0) == es_x:
+            return 'X', distancia, columna
+        return 'O', distancia, columna
+
+    def nodos_por_segundo(self) -> float:
+        return self.nodos / self.segundos if self.segundos else 0.0
+
+    def _preparar(self, alto: int, ancho: int) -> None:
+        if (self.alto, self.ancho) == (alto, ancho):
+            return
+        self.alto = alto
+        self.ancho = ancho
+        self.celdas = alto * ancho
+        centro = (ancho - 1) / 2
+        self.orden = sorted(range(ancho), key=lambda c: abs(c - centro))
+        self.fondos = [1 << (c * (alto + 1)) for c in range(ancho)]
+        self.topes = [1 << (c * (alto + 1) + alto - 1) for c in range(ancho)]
+        self.columnas = [((1 << alto) - 1) << (c * (alto + 1)) for c in range(ancho)]
+        self.tabla = TablaAcotada(self.tabla.tamanio)
+
+    def _resolver_valor(self, actual: int, mascara: int, movimientos: int) -> int:
+        """Encuentra el valor exacto con búsquedas de ventana nula, acotando
+        el intervalo posible a la mitad en cada paso."""
+        minimo = -(self.celdas - movimientos)
+        maximo = self.celdas - movimientos
+        while minimo < maximo:
+            medio = minimo + (maximo - minimo) // 2
+            resultado = self._negamax(actual, mascara, movimientos, medio, medio + 1)
+            if resultado <= medio:
+                maximo = resultado
+            else:
+                minimo = resultado
+        return minimo
+
+    def _mejor_columna(self, actual: int, mascara: int, movimientos: int, valor: int) -> int:
+        """Devuelve una columna que alcanza el valor de la posición."""
+        for c in self.orden:
+            if mascara & self.topes[c]:
+                continue
+            nueva = mascara | (mascara + self.fondos[c])
+            if cuatro_en_linea.hay_cuatro_en_linea(actual | (nueva & ~mascara), self.alto):
+                if valor == self.celdas - movimientos:
+                    return c
+                continue
+            if movimientos + 1 == self.celdas:
+                return c
+            # El valor de la jugada es >= valor si el del rival es <= -valor.
+            if self._negamax(actual ^ mascara, nueva, movimientos + 1, -valor, -valor + 1) <= -valor:
+                return c
+        return None
+
+    def _negamax(self, actual: int, mascara: int, movimientos: int, alfa: int, beta: int) -> int:
+        self.nodos += 1
+        celdas = self.celdas
+        if movimientos == celdas:
+            return 0
+        libres = []
+        for c in self.orden:
+            if mascara & self.topes[c]:
+                continue
+            bit = (mascara + self.fondos[c]) & self.columnas[c]
+            if cuatro_en_linea.hay_cuatro_en_linea(actual | bit, self.alto):
+                return celdas - movimientos
+            libres.append(c)
+        # Sin victoria inmediata, lo mejor posible es ganar con el próximo
+        # símbolo propio, o empatar si ya no quedan celdas para hacerlo.
+        maximo = max(celdas - movimientos - 2, 0)
+        if beta > maximo:
+            beta = maximo
+            if alfa >= beta:
+                return beta
+        clave = actual + mascara
+        entrada = self.tabla.buscar(clave)
+        if entrada is not None:
+            if entrada[2] == EXACTA:
+                return entrada[1]
+            if entrada[2] == COTA_INFERIOR:
+                alfa = max(alfa, entrada[1])
+            else:
+                beta = min(beta, entrada[1])
+            if alfa >= beta:
+                return entrada[1]
+        alfa_original = alfa
+        mejor = -celdas
+        rival = actual ^ mascara
+        for c in libres:
+            valor = -self._negamax(rival, mascara | (mascara + self.fondos[c]), movimientos + 1, -beta, -alfa)
+            if valor > mejor:
+                mejor = valor
+                if valor > alfa:
+                    alfa = valor
+                    if alfa >= beta:
+                        break
+        if mejor <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = EXACTA
+        self.tabla.guardar(clave, mejor, tipo, celdas - movimientos)
+        return mejor
+
+
+def tablero_desde_jugadas(n_filas: int, n_columnas: int, jugadas: str) -> cuatro_en_linea.TableroBits:
+    """Crea un tablero insertando en orden las columnas de `jugadas`, una
+    cifra por jugada."""
+    tablero = cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True)
+    for jugada in jugadas:
+        cuatro_en_linea.insertar_simbolo(tablero, int(jugada))
+    return tablero
+
+
+def main():
+    """Resuelve posiciones y muestra estadísticas de la búsqueda.
+    Uso: python solucionador.py [filas columnas jugadas]
+    Sin argumentos, resuelve las posiciones de `POSICIONES_DE_PRUEBA`."""
+    if len(sys.argv) == 4:
+        posiciones = {sys.argv[3]: (int(sys.argv[1]), int(sys.argv[2]), sys.argv[3])}
+    else:
+        posiciones = {nombre: (5, 5, jugadas) for nombre, jugadas in POSICIONES_DE_PRUEBA.items()}
+    for nombre, (n_filas, n_columnas, jugadas) in posiciones.items():
+        solucionador = Solucionador()
+        tablero = tablero_desde_jugadas(n_filas, n_columnas, jugadas)
+        ganador, distancia, columna = solucionador.resolver(tablero)
+        resultado = 'empate' if ganador == ' ' else f'gana {ganador}'
+        print(f'{nombre}: {resultado} en {distancia} jugadas, mejor columna {columna}')
+        print(f'    {solucionador.nodos} nodos, {solucionador.nodos_por_segundo():.0f} nodos/s, '
+              f'{solucionador.tabla.tasa_aciertos():.1%} de aciertos en la tabla')
+
+
+if __name__ == '__main__':
+    main()
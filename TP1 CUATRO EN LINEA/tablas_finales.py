@@ -0,0 +1,293 @@
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import time
+from array import array
+from typing import List, Tuple
+
+import cuatro_en_linea
+
+# Formato del archivo:
+#   encabezado: firma, versión, filas, columnas y cantidad de posiciones
+#               alcanzables
+#   valores:    2 bits por posición, cuatro por byte empezando por los bits
+#               menos significativos
+# La posición se ubica con un hash perfecto: su clave en el formato de
+# `TableroBits` (`alto + 1` bits por columna) con las celdas del jugador que
+# mueve, más las ocupadas, más la fila de abajo. En cada columna queda un 1
+# arriba de la última celda ocupada y debajo las celdas del jugador que
+# mueve, por lo que dos posiciones distintas nunca comparten clave. La
+# tabla tiene un valor por cada clave posible, alcanzable o no, y la
+# búsqueda lee un solo byte.
+FIRMA = b'C4TF'
+VERSION = 1
+ENCABEZADO = struct.Struct('<4sHBBQ')
+
+# Valores, para el jugador que mueve.
+DESCONOCIDA = 0
+GANA = 1
+PIERDE = 2
+EMPATE = 3
+
+# Tamaños para los que se puede generar la tabla: el archivo ocupa
+# 2 ** ((filas + 1) * columnas) / 4 bytes (256 MiB para 5x5).
+TAMANIOS = ((4, 4), (4, 5), (5, 4), (5, 5))
+TAMANIO_TANDA = 20_000
+
+
+def ruta_tabla(n_filas: int, n_columnas: int) -> str:
+    """Devuelve la ruta por defecto de la tabla para un tablero de
+    n_filas por n_columnas, junto a este módulo."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'tabla_{n_filas}x{n_columnas}.bin')
+
+
+def _fondo(alto: int, ancho: int) -> int:
+    """Devuelve la máscara con la celda de abajo de cada columna."""
+    fondo = 0
+    for c in range(ancho):
+        fondo |= 1 << (c * (alto + 1))
+    return fondo
+
+
+def clave_tablero(tablero: cuatro_en_linea.TableroBits) -> int:
+    """Devuelve el índice de la posición en la tabla."""
+    actual = tablero.bits_x if tablero.es_turno_de_x() else tablero.bits_o
+    return actual + (tablero.bits_x | tablero.bits_o) + _fondo(tablero.alto, tablero.ancho)
+
+
+def _decodificar(clave: int, alto: int, ancho: int) -> Tuple[int, int]:
+    """Inversa de `clave_tablero`: devuelve las máscaras del jugador que
+    mueve y de las celdas ocupadas."""
+    actual = 0
+    mascara = 0
+    for c in range(ancho):
+        desplazamiento = c * (alto + 1)
+        columna = (clave >> desplazamiento) & ((1 << (alto + 1)) - 1)
+        tope = 1 << (columna.bit_length() - 1)
+        actual |= (columna - tope) << desplazamiento
+        mascara |= (tope - 1) << desplazamiento
+    return actual, mascara
+
+
+def _leer_valor(datos, clave: int) -> int:
+    return (datos[ENCABEZADO.size + (clave >> 2)] >> ((clave & 3) * 2)) & 3
+
+
+class TablaFinales:
+    """Tabla de finales abierta con `mmap`: cada búsqueda lee un byte."""
+
+    def __init__(self, ruta: str):
+        self._archivo = open(ruta, 'rb')
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        firma, version, self.filas, self.columnas, self.posiciones = ENCABEZADO.unpack_from(self._mapa, 0)
+        if firma != FIRMA or version != VERSION:
+            self.cerrar()
+            raise ValueError(f'{ruta} no es una tabla de finales valida')
+
+    def valor(self, tablero: List[List[str]]) -> int:
+        """Devuelve GANA, PIERDE o EMPATE para el jugador que mueve, o
+        DESCONOCIDA si la posición no es alcanzable en una partida."""
+        if not isinstance(tablero, cuatro_en_linea.TableroBits):
+            tablero = cuatro_en_linea.TableroBits.desde_lista(tablero)
+        return _leer_valor(self._mapa, clave_tablero(tablero))
+
+    def ganador(self, tablero: List[List[str]]) -> str:
+        """Devuelve el símbolo que gana con juego perfecto, ' ' si es empate,
+        o None si la posición no está en la tabla."""
+        valor = self.valor(tablero)
+        if valor == DESCONOCIDA:
+            return None
+        if valor == EMPATE:
+            return ' '
+        es_x = cuatro_en_linea.es_turno_de_x(tablero)
+        return 'X' if (valor == GANA) == es_x else 'O'
+
+    def cerrar(self) -> None:
+        self._mapa.close()
+        self._archivo.close()
+
+
+def abrir_tabla(n_filas: int, n_columnas: int) -> TablaFinales:
+    """Abre la tabla por defecto para el tamaño de tablero dado, o devuelve
+    None si no fue generada."""
+    ruta = ruta_tabla(n_filas, n_columnas)
+    if not os.path.exists(ruta):
+        return None
+    return TablaFinales(ruta)
+
+
+# Estado de cada proceso de la generación, preparado por `_iniciar_proceso`.
+_alto = _ancho = _fondo_total = _mapa = None
+
+
+def _iniciar_proceso(ruta: str, alto: int, ancho: int) -> None:
+    global _alto, _ancho, _fondo_total, _mapa
+    _alto = alto
+    _ancho = ancho
+    _fondo_total = _fondo(alto, ancho)
+    if ruta is not None:
+        with open(ruta, 'rb') as archivo:
+            _mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _jugadas(actual: int, mascara: int):
+    """Recorre las jugadas posibles como (máscara nueva, gana)."""
+    for c in range(_ancho):
+        if (mascara >> (c * (_alto + 1) + _alto - 1)) & 1:
+            continue
+        nueva = mascara | (mascara + (1 << (c * (_alto + 1))))
+        yield nueva, cuatro_en_linea.hay_cuatro_en_linea(actual | (nueva ^ mascara), _alto)
+
+
+def _expandir(claves: array) -> Tuple[List[int], List[int]]:
+    """Devuelve las claves de las posiciones que siguen a las dadas,
+    separando las que terminaron con un cuatro en línea."""
+    hijos = []
+    terminales = []
+    for clave in claves:
+        actual, mascara = _decodificar(clave, _alto, _ancho)
+        rival = actual ^ mascara
+        for nueva, gana in _jugadas(actual, mascara):
+            (terminales if gana else hijos).append(rival + nueva + _fondo_total)
+    return hijos, terminales
+
+
+def _evaluar(claves: array) -> List[Tuple[int, int]]:
+    """Calcula el valor de cada posición a partir de los valores, ya
+    guardados en la tabla, de las posiciones con un símbolo más."""
+    resultados = []
+    celdas = _alto * _ancho
+    for clave in claves:
+        actual, mascara = _decodificar(clave, _alto, _ancho)
+        if bin(mascara).count('1') == celdas:
+            resultados.append((clave, EMPATE))
+            continue
+        rival = actual ^ mascara
+        valor = PIERDE
+        for nueva, gana in _jugadas(actual, mascara):
+            if gana:
+                valor = GANA
+                break
+            valor_hijo = _leer_valor(_mapa, rival + nueva + _fondo_total)
+            if valor_hijo == PIERDE:
+                valor = GANA
+                break
+            if valor_hijo == EMPATE:
+                valor = EMPATE
+        resultados.append((clave, valor))
+    return resultados
+
+
+def _tandas(claves: array, tamanio: int):
+    for inicio in range(0, len(claves), tamanio):
+        yield claves[inicio:inicio + tamanio]
+
+
+def _memoria() -> str:
+    """Devuelve el pico de memoria del proceso principal para mostrar en el
+    progreso, o '' donde no se puede medir (`resource` sólo existe en
+    Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return ''
+    return f', {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB'
+
+
+def generar_tabla(ruta: str, n_filas: int, n_columnas: int, procesos: int, tamanio_tanda: int = TAMANIO_TANDA) -> int:
+    """Genera la tabla de finales de un tablero y devuelve la cantidad de
+    posiciones alcanzables.
+
+    Primero recorre hacia adelante, capa por capa, todas las posiciones
+    alcanzables desde el tablero vacío y guarda cada capa en un archivo
+    temporal; las que terminaron con un cuatro en línea se guardan como
+    perdidas para el jugador que mueve. Después recorre las capas hacia
+    atrás, desde el tablero completo: el valor de cada posición sale de los
+    de la capa siguiente, ya escritos en la tabla. Cada capa se reparte en
+    tandas entre `procesos` procesos."""
+    alto, ancho = n_filas, n_columnas
+    fondo = _fondo(alto, ancho)
+    celdas = alto * ancho
+    cantidad_claves = 1 << ((alto + 1) * ancho)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(ENCABEZADO.pack(FIRMA, VERSION, alto, ancho, 0))
+        archivo.truncate(ENCABEZADO.size + cantidad_claves // 4)
+    archivo = open(ruta, 'r+b')
+    tabla = mmap.mmap(archivo.fileno(), 0)
+    inicio = time.perf_counter()
+
+    def guardar(clave: int, valor: int) -> None:
+        indice = ENCABEZADO.size + (clave >> 2)
+        desplazamiento = (clave & 3) * 2
+        tabla[indice] = (tabla[indice] & ~(3 << desplazamiento)) | (valor << desplazamiento)
+
+    total = 0
+    with tempfile.TemporaryDirectory() as directorio:
+        with multiprocessing.Pool(procesos, _iniciar_proceso, (None, alto, ancho)) as pool:
+            capa = array('Q', [fondo])
+            for movimientos in range(celdas + 1):
+                with open(os.path.join(directorio, f'{movimientos}.bin'), 'wb') as archivo_capa:
+                    capa.tofile(archivo_capa)
+                total += len(capa)
+                siguiente = set()
+                for hijos, terminales in pool.imap_unordered(_expandir, _tandas(capa, tamanio_tanda)):
+                    siguiente.update(hijos)
+                    for clave in terminales:
+                        if _leer_valor(tabla, clave) == DESCONOCIDA:
+                            guardar(clave, PIERDE)
+                            total += 1
+                print(f'Adelante, {movimientos:2} jugadas: {len(capa):>10} posiciones, '
+                      f'{time.perf_counter() - inicio:7.1f} s{_memoria()}', flush=True)
+                capa = array('Q', sorted(siguiente))
+                del siguiente
+
+        tabla.flush()
+        with multiprocessing.Pool(procesos, _iniciar_proceso, (ruta, alto, ancho)) as pool:
+            for movimientos in range(celdas, -1, -1):
+                capa = array('Q')
+                ruta_capa = os.path.join(directorio, f'{movimientos}.bin')
+                with open(ruta_capa, 'rb') as archivo_capa:
+                    capa.fromfile(archivo_capa, os.path.getsize(ruta_capa) // capa.itemsize)
+                # Los procesos sólo leen valores de la capa siguiente, que ya
+                # están completos en el archivo compartido. Escribir los de
+                # esta capa cambia otros bits de los mismos bytes, así que
+                # no interfiere con esas lecturas.
+                for resultados in pool.imap_unordered(_evaluar, _tandas(capa, tamanio_tanda)):
+                    for clave, valor in resultados:
+                        guardar(clave, valor)
+                tabla.flush()
+                print(f'Atras, {movimientos:2} jugadas: {len(capa):>10} posiciones, '
+                      f'{time.perf_counter() - inicio:7.1f} s{_memoria()}', flush=True)
+
+    ENCABEZADO.pack_into(tabla, 0, FIRMA, VERSION, alto, ancho, total)
+    tabla.close()
+    archivo.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera la tabla de finales de un tablero chico.')
+    parser.add_argument('filas', type=int)
+    parser.add_argument('columnas', type=int)
+    parser.add_argument('--ruta', help='archivo de salida (por defecto, junto a este modulo)')
+    parser.add_argument('--procesos', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--tanda', type=int, default=TAMANIO_TANDA, help='posiciones por unidad de trabajo')
+    args = parser.parse_args()
+    if (args.filas, args.columnas) not in TAMANIOS:
+        parser.error(f"tamaños posibles: {', '.join(f'{f}x{c}' for f, c in TAMANIOS)}")
+    ruta = args.ruta or ruta_tabla(args.filas, args.columnas)
+    inicio = time.perf_counter()
+    total = generar_tabla(ruta, args.filas, args.columnas, args.procesos, args.tanda)
+    print(f'{total} posiciones en {time.perf_counter() - inicio:.1f} s, guardadas en {ruta}')
+
+    tabla = TablaFinales(ruta)
+    ganador = tabla.ganador(cuatro_en_linea.crear_tablero(args.filas, args.columnas, bits=True))
+    tabla.cerrar()
+    print('Con juego perfecto:', 'empate' if ganador == ' ' else f'gana {ganador}')
+
+
+if __name__ == '__main__':
+    main()
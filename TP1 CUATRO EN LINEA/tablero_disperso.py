@@ -0,0 +1,157 @@
+import sys
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+DIRECCIONES = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class TableroDisperso:
+    """Tablero con gravedad para jugar k en línea en tableros enormes (por
+    ejemplo 10.000 x 10.000) sin reservar memoria para las celdas vacías.
+
+    Sólo se guardan la altura de las columnas que tienen algún símbolo y las
+    celdas ocupadas, en diccionarios, por lo que la memoria crece con la
+    cantidad de jugadas y no con el tamaño del tablero. Insertar un símbolo y
+    verificar si formó una línea cuestan lo mismo sin importar el tamaño: el
+    chequeo sólo mira las hasta `k - 1` celdas vecinas en cada dirección.
+
+    Las filas se indexan desde arriba, como en `crear_tablero`, y el tablero
+    tiene los mismos métodos que `cuatro_en_linea.TableroBits`, así que las
+    funciones de `cuatro_en_linea` lo aceptan.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int, k: int = 4):
+        self.alto = n_filas
+        self.ancho = n_columnas
+        self.k = k
+        self.alturas: Dict[int, int] = {}
+        self.celdas: Dict[Tuple[int, int], str] = {}
+        self.movimientos = 0
+        self.ultima_jugada = None
+        self.jugadas: List[int] = []
+        self.deshechas: List[int] = []
+
+    def celda(self, fila: int, columna: int) -> str:
+        """Devuelve el símbolo de la celda (fila, columna): 'X', 'O' o ' '."""
+        return self.celdas.get((fila, columna), ' ')
+
+    def es_turno_de_x(self) -> bool:
+        return self.movimientos % 2 == 0
+
+    def columna_llena(self, columna: int) -> bool:
+        return self.alturas.get(columna, 0) == self.alto
+
+    def insertar(self, columna: int) -> bool:
+        """Inserta el símbolo del turno actual en la columna indicada.
+        Devuelve False si la columna es inválida o está llena. Una jugada
+        nueva descarta las jugadas deshechas."""
+        if columna < 0 or columna >= self.ancho or self.columna_llena(columna):
+            return False
+        self._colocar(columna)
+        if self.deshechas:
+            self.deshechas.clear()
+        return True
+
+    def deshacer(self) -> bool:
+        """Quita el último símbolo insertado y lo apila para rehacerlo.
+        Devuelve False si no hay jugadas para deshacer."""
+        if not self.jugadas:
+            return False
+        columna = self.jugadas.pop()
+        altura = self.alturas[columna] - 1
+        del self.celdas[(self.alto - 1 - altura, columna)]
+        if altura:
+            self.alturas[columna] = altura
+        else:
+            del self.alturas[columna]
+        self.movimientos -= 1
+        self.deshechas.append(columna)
+        if self.jugadas:
+            anterior = self.jugadas[-1]
+            self.ultima_jugada = (self.alto - self.alturas[anterior], anterior)
+        else:
+            self.ultima_jugada = None
+        return True
+
+    def rehacer(self) -> bool:
+        """Vuelve a insertar el último símbolo deshecho. Devuelve False si
+        no hay jugadas para rehacer."""
+        if not self.deshechas:
+            return False
+        self._colocar(self.deshechas.pop())
+        return True
+
+    def _colocar(self, columna: int) -> None:
+        altura = self.alturas.get(columna, 0)
+        fila = self.alto - 1 - altura
+        self.celdas[(fila, columna)] = 'X' if self.movimientos % 2 == 0 else 'O'
+        self.alturas[columna] = altura + 1
+        self.movimientos += 1
+        self.ultima_jugada = (fila, columna)
+        self.jugadas.append(columna)
+
+    def completo(self) -> bool:
+        return self.movimientos == self.alto * self.ancho
+
+    def ganador_desde(self, fila: int, columna: int) -> str:
+        """Devuelve el símbolo de la celda si forma una línea de `k`
+        símbolos iguales, o ' ' si no."""
+        simbolo = self.celdas.get((fila, columna), ' ')
+        if simbolo == ' ':
+            return ' '
+        celdas = self.celdas
+        for df, dc in DIRECCIONES:
+            consecutivos = 1
+            for sentido in (1, -1):
+                f = fila + df * sentido
+                c = columna + dc * sentido
+                while consecutivos < self.k and celdas.get((f, c)) == simbolo:
+                    consecutivos += 1
+                    f += df * sentido
+                    c += dc * sentido
+            if consecutivos >= self.k:
+                return simbolo
+        return ' '
+
+    def ganador(self) -> str:
+        """Devuelve el símbolo de alguna línea de `k` símbolos iguales, o ' '
+        si no hay. Recorre sólo las celdas ocupadas."""
+        for fila, columna in self.celdas:
+            simbolo = self.ganador_desde(fila, columna)
+            if simbolo != ' ':
+                return simbolo
+        return ' '
+
+
+def main():
+    """Juega al azar sobre un tablero enorme y mide velocidad y memoria.
+    Uso: python tablero_disperso.py [filas] [columnas] [k] [jugadas]"""
+    argumentos = [int(a) for a in sys.argv[1:]]
+    n_filas, n_columnas, k, jugadas = argumentos + [10_000, 10_000, 5, 200_000][len(argumentos):]
+    generador = random.Random(0)
+    tracemalloc.start()
+    tablero = TableroDisperso(n_filas, n_columnas, k)
+    ganador = ' '
+    inicio = time.perf_counter()
+    # Las jugadas se concentran en una franja de columnas para que se formen
+    # líneas en un tiempo razonable.
+    franja = min(n_columnas, 2 * k)
+    while tablero.movimientos < jugadas and not tablero.completo():
+        columna = generador.randrange(franja)
+        if not tablero.insertar(columna):
+            continue
+        ganador = tablero.ganador_desde(*tablero.ultima_jugada)
+        if ganador != ' ':
+            break
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultado = 'sin ganador' if ganador == ' ' else f'gana {ganador}'
+    print(f'Tablero {n_filas}x{n_columnas}, {k} en linea: {resultado} tras {tablero.movimientos} jugadas')
+    print(f'{tablero.movimientos / duracion:.0f} jugadas/s, pico de memoria {pico / 1024:.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
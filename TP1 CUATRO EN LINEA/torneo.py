@@ -0,0 +1,186 @@
+import argparse
+import multiprocessing
+import random
+import time
+from typing import List, Tuple
+
+import cuatro_en_linea
+import ia
+import registro_partidas
+
+
+class JugadorAleatorio:
+    """Juega en una columna libre cualquiera."""
+
+    def __init__(self, semilla: int = None):
+        self.generador = random.Random(semilla)
+
+    def elegir_columna(self, tablero: cuatro_en_linea.TableroBits) -> int:
+        return self.generador.choice(_columnas_libres(tablero))
+
+
+class JugadorCodicioso:
+    """Gana si puede hacerlo en esta jugada; si no, bloquea una victoria
+    inmediata del rival; si no, juega al azar prefiriendo el centro."""
+
+    def __init__(self, semilla: int = None):
+        self.generador = random.Random(semilla)
+
+    def elegir_columna(self, tablero: cuatro_en_linea.TableroBits) -> int:
+        libres = _columnas_libres(tablero)
+        if tablero.es_turno_de_x():
+            propia, ajena = tablero.bits_x, tablero.bits_o
+        else:
+            propia, ajena = tablero.bits_o, tablero.bits_x
+        for mascara in (propia, ajena):
+            for columna in libres:
+                bit = 1 << (columna * (tablero.alto + 1) + tablero.alturas[columna])
+                if cuatro_en_linea.hay_cuatro_en_linea(mascara | bit, tablero.alto):
+                    return columna
+        centro = (tablero.ancho - 1) / 2
+        pesos = [tablero.ancho - abs(columna - centro) for columna in libres]
+        return self.generador.choices(libres, weights=pesos, k=1)[0]
+
+
+class JugadorBusqueda:
+    """Juega con `ia.JugadorIA` a poca profundidad, salvo su primera jugada
+    de cada partida, que es al azar. Como la búsqueda no tiene azar, sin esa
+    jugada todas las partidas entre dos de estos jugadores en un mismo
+    tablero serían la misma."""
+
+    def __init__(self, semilla: int = None):
+        self.generador = random.Random(semilla)
+        self.jugador = ia.JugadorIA(profundidad=4, tiempo=0.05, tamanio_tabla=1 << 14)
+
+    def elegir_columna(self, tablero: cuatro_en_linea.TableroBits) -> int:
+        if tablero.movimientos < 2:
+            return self.generador.choice(_columnas_libres(tablero))
+        return self.jugador.elegir_columna(tablero)
+
+
+JUGADORES = {
+    'aleatorio': JugadorAleatorio,
+    'codicioso': JugadorCodicioso,
+    'busqueda': JugadorBusqueda,
+}
+
+
+def _columnas_libres(tablero: cuatro_en_linea.TableroBits) -> List[int]:
+    return [c for c in range(tablero.ancho) if not tablero.columna_llena(c)]
+
+
+def jugar_partida(jugador_x, jugador_o, n_filas: int, n_columnas: int) -> Tuple[str, List[int]]:
+    """Juega una partida completa entre dos jugadores sin intervención del
+    usuario. Devuelve el símbolo ganador (' ' si hay empate) y las columnas
+    jugadas en orden."""
+    tablero = cuatro_en_linea.crear_tablero(n_filas, n_columnas, bits=True)
+    jugadas = []
+    while not cuatro_en_linea.tablero_completo(tablero):
+        jugador = jugador_x if cuatro_en_linea.es_turno_de_x(tablero) else jugador_o
+        columna = jugador.elegir_columna(tablero)
+        fila = cuatro_en_linea.insertar_simbolo_en_fila(tablero, columna)
+        jugadas.append(columna)
+        ganador = cuatro_en_linea.obtener_ganador_desde(tablero, fila, columna)
+        if ganador != ' ':
+            return ganador, jugadas
+    return ' ', jugadas
+
+
+def _jugar_tanda(tanda: Tuple) -> Tuple:
+    """Juega una tanda de partidas de un mismo cruce y tamaño. Es la unidad de
+    trabajo que se reparte entre los procesos. Si se pide registrar, también
+    devuelve los registros binarios de las partidas jugadas."""
+    nombre_x, nombre_o, n_filas, n_columnas, partidas, semilla, registrar = tanda
+    jugador_x = JUGADORES[nombre_x](semilla)
+    jugador_o = JUGADORES[nombre_o](semilla + 1)
+    resultados = {'X': 0, 'O': 0, ' ': 0}
+    movimientos = 0
+    registros = []
+    for _ in range(partidas):
+        ganador, jugadas = jugar_partida(jugador_x, jugador_o, n_filas, n_columnas)
+        resultados[ganador] += 1
+        movimientos += len(jugadas)
+        if registrar:
+            registros.append(registro_partidas.codificar_partida(n_filas, n_columnas, jugadas))
+    return nombre_x, nombre_o, resultados, partidas, movimientos, b''.join(registros)
+
+
+def armar_tandas(jugadores: List[str], tamanios: List[Tuple[int, int]], partidas: int, tamanio_tanda: int, semilla: int, registrar: bool = False) -> List[Tuple]:
+    """Reparte en tandas `partidas` partidas por cada cruce ordenado de
+    jugadores (cada uno juega con X y con O) y cada tamaño de tablero."""
+    tandas = []
+    for nombre_x in jugadores:
+        for nombre_o in jugadores:
+            for n_filas, n_columnas in tamanios:
+                for inicio in range(0, partidas, tamanio_tanda):
+                    cantidad = min(tamanio_tanda, partidas - inicio)
+                    tandas.append((nombre_x, nombre_o, n_filas, n_columnas, cantidad, semilla + 2 * len(tandas), registrar))
+    return tandas
+
+
+def leer_tamanios(texto: str) -> List[Tuple[int, int]]:
+    """Interpreta una lista de tamaños separados por comas: `FxC` para un
+    tablero de F filas y C columnas, o `A-B` para todos los tableros
+    cuadrados de A a B."""
+    tamanios = []
+    for parte in texto.split(','):
+        if 'x' in parte:
+            n_filas, n_columnas = parte.split('x')
+            tamanios.append((int(n_filas), int(n_columnas)))
+        else:
+            desde, hasta = parte.split('-')
+            tamanios.extend((n, n) for n in range(int(desde), int(hasta) + 1))
+    for n_filas, n_columnas in tamanios:
+        if not (cuatro_en_linea.validar_ancho_alto(n_filas) and cuatro_en_linea.validar_ancho_alto(n_columnas)):
+            raise argparse.ArgumentTypeError(f'tamaño invalido: {n_filas}x{n_columnas}')
+    return tamanios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Torneo de cuatro en linea entre jugadores automaticos.')
+    parser.add_argument('--jugadores', default='aleatorio,codicioso',
+                        help=f"jugadores separados por comas, de entre: {', '.join(JUGADORES)}")
+    parser.add_argument('--partidas', type=int, default=200, help='partidas por cruce y tamaño')
+    parser.add_argument('--tamanios', type=leer_tamanios, default=leer_tamanios('4-10'),
+                        help="tamaños como '6x7,5x5' o '4-10' (cuadrados)")
+    parser.add_argument('--procesos', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--tanda', type=int, default=50, help='partidas por unidad de trabajo')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--registro', help='archivo donde agregar las partidas jugadas (ver registro_partidas.py)')
+    args = parser.parse_args()
+    jugadores = args.jugadores.split(',')
+    for nombre in jugadores:
+        if nombre not in JUGADORES:
+            parser.error(f'jugador desconocido: {nombre}')
+
+    tandas = armar_tandas(jugadores, args.tamanios, args.partidas, args.tanda, args.semilla, args.registro is not None)
+    escritor = registro_partidas.EscritorRegistro(args.registro) if args.registro else None
+    cruces = {}
+    total_partidas = 0
+    total_movimientos = 0
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(args.procesos) as pool:
+        for nombre_x, nombre_o, resultados, partidas, movimientos, registros in pool.imap_unordered(_jugar_tanda, tandas):
+            acumulado = cruces.setdefault((nombre_x, nombre_o), {'X': 0, 'O': 0, ' ': 0})
+            for simbolo, cantidad in resultados.items():
+                acumulado[simbolo] += cantidad
+            total_partidas += partidas
+            total_movimientos += movimientos
+            if escritor is not None:
+                escritor.escribir_registros(registros)
+    duracion = time.perf_counter() - inicio
+    if escritor is not None:
+        escritor.cerrar()
+
+    print(f'{total_partidas} partidas en {duracion:.2f} s con {args.procesos} procesos')
+    print(f'{total_partidas / duracion:.1f} partidas/s, {total_movimientos / duracion:.1f} jugadas/s')
+    print()
+    print(f"{'X':>10} vs {'O':<10} {'gana X':>8} {'gana O':>8} {'empate':>8}")
+    for (nombre_x, nombre_o), resultados in sorted(cruces.items()):
+        partidas = sum(resultados.values())
+        print(f"{nombre_x:>10} vs {nombre_o:<10} "
+              f"{resultados['X'] / partidas:>8.1%} {resultados['O'] / partidas:>8.1%} {resultados[' '] / partidas:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
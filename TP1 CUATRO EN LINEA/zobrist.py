@@ -0,0 +1,107 @@
+import functools
+import random
+from typing import List, Tuple
+
+Claves = Tuple[Tuple[Tuple[int, int], ...], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def claves_zobrist(n_filas: int, n_columnas: int, semilla: int = 0) -> Claves:
+    """Devuelve las claves Zobrist para un tablero de n_filas por n_columnas.
+    `claves[c][h]` es un par con la clave de X y la de O para la celda de la
+    columna `c` que está a altura `h` contando desde abajo. La clave de una
+    posición es el XOR de las claves de sus celdas ocupadas, y se actualiza
+    con un solo XOR al insertar o quitar un símbolo.
+    Las claves son siempre las mismas para un mismo tamaño y semilla, por lo
+    que se pueden guardar en archivos (por ejemplo, en un libro de aperturas)."""
+    generador = random.Random(semilla * 1_000_003 + n_filas * 100 + n_columnas)
+    claves = []
+    for c in range(n_columnas):
+        columna = []
+        for h in range(n_filas):
+            columna.append((generador.getrandbits(64), generador.getrandbits(64)))
+        claves.append(tuple(columna))
+    return tuple(claves)
+
+
+def claves_tablero(tablero: List[List[str]], claves: Claves) -> Tuple[int, int]:
+    """Dado un tablero y sus claves Zobrist, devuelve la clave de la posición
+    y la de su imagen espejo (el mismo tablero reflejado de izquierda a
+    derecha)."""
+    alto = len(tablero)
+    ancho = len(tablero[0])
+    clave = 0
+    espejo = 0
+    for c in range(ancho):
+        for h in range(alto):
+            simbolo = tablero[alto - 1 - h][c]
+            if simbolo == ' ':
+                break
+            indice = 0 if simbolo == 'X' else 1
+            clave ^= claves[c][h][indice]
+            espejo ^= claves[ancho - 1 - c][h][indice]
+    return clave, espejo
+
+
+def clave_canonica(clave: int, espejo: int) -> int:
+    """Devuelve la clave que representa tanto a una posición como a su imagen
+    espejo: la menor de las dos."""
+    return espejo if espejo < clave else clave
+
+
+def espejar_columna(columna: int, n_columnas: int) -> int:
+    """Devuelve la columna que corresponde a `columna` en el tablero
+    reflejado."""
+    return n_columnas - 1 - columna
+
+
+class HashPosicion:
+    """Clave Zobrist de una posición y de su imagen espejo, actualizadas en
+    forma incremental a medida que se insertan o quitan símbolos.
+
+    La clave canónica es igual para una posición y su reflejo, por lo que
+    sirve para que tablas de transposición, libros de aperturas o registros
+    de partidas guarden una sola vez cada par de posiciones simétricas. Lo
+    que se guarde asociado a una columna se debe pasar por `a_canonica` al
+    guardar y por `desde_canonica` al leer.
+    """
+
+    def __init__(self, n_filas: int, n_columnas: int, tablero: List[List[str]] = None, semilla: int = 0):
+        self.columnas = n_columnas
+        self.claves = claves_zobrist(n_filas, n_columnas, semilla)
+        self.clave = 0
+        self.espejo = 0
+        if tablero is not None:
+            self.clave, self.espejo = claves_tablero(tablero, self.claves)
+
+    def copiar(self) -> 'HashPosicion':
+        """Devuelve un hash independiente con las mismas claves."""
+        copia = HashPosicion.__new__(HashPosicion)
+        copia.columnas = self.columnas
+        copia.claves = self.claves
+        copia.clave = self.clave
+        copia.espejo = self.espejo
+        return copia
+
+    def alternar(self, columna: int, altura: int, es_x: bool) -> None:
+        """Agrega a la clave el símbolo en (columna, altura) si no estaba, o lo
+        quita si estaba: como la actualización es un XOR, insertar y deshacer
+        una inserción son la misma operación."""
+        indice = 0 if es_x else 1
+        self.clave ^= self.claves[columna][altura][indice]
+        self.espejo ^= self.claves[self.columnas - 1 - columna][altura][indice]
+
+    def canonica(self) -> int:
+        return clave_canonica(self.clave, self.espejo)
+
+    def espejada(self) -> bool:
+        """Devuelve True si la clave canónica es la de la imagen espejo."""
+        return self.espejo < self.clave
+
+    def a_canonica(self, columna: int) -> int:
+        """Convierte una columna de la posición a la orientación canónica."""
+        return espejar_columna(columna, self.columnas) if self.espejada() else columna
+
+    def desde_canonica(self, columna: int) -> int:
+        """Convierte una columna en orientación canónica a la de la posición."""
+        return self.a_canonica(columna)
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Tuple
+
+import chats_de_whatsapp
+
+# Formato del archivo de cache, que se guarda junto al chat con el mismo
+# nombre terminado en `.cache`:
+#   encabezado: firma, version, tamaño y fecha de modificacion del chat (en
+#               nanosegundos), huella del chat y posicion y largo de cada
+#               seccion
+#   secciones:  vocabulario y autores (UTF-8, uno por linea), palabras por
+#               autor y cadenas de Markov (enteros de 32 bits)
+# Las secciones son las de `chats_de_whatsapp.codificar_datos`: las palabras
+# se guardan una sola vez, en el vocabulario, y el resto del archivo las
+# nombra por su posicion en el.
+FIRMA = b'WPPC'
+VERSION = 2
+ENCABEZADO = struct.Struct('<4sH2xQQ16s8Q')
+BYTES_HUELLA = 1 << 20
+# A partir de este tamaño el chat se procesa en varios procesos.
+BYTES_EN_PARALELO = 64 << 20
+
+
+def ruta_cache(archivo:str) -> str:
+    """Dado el archivo de un chat, devuelve la ruta de su cache."""
+    return archivo + '.cache'
+
+
+def huella(archivo:str, tamanio:int) -> bytes:
+    """Dado un archivo y su tamaño, devuelve un resumen de su primer y su
+    ultimo MiB. Junto con el tamaño y la fecha de modificacion detecta los
+    cambios en el chat sin tener que leerlo entero."""
+    resumen = hashlib.blake2b(str(tamanio).encode(), digest_size=16)
+    with open(archivo, 'rb') as entrada:
+        resumen.update(entrada.read(BYTES_HUELLA))
+        if tamanio > BYTES_HUELLA:
+            entrada.seek(max(BYTES_HUELLA, tamanio - BYTES_HUELLA))
+            resumen.update(entrada.read(BYTES_HUELLA))
+    return resumen.digest()
+
+
+def guardar_cache(chat:chats_de_whatsapp.Chat, archivo:str) -> None:
+    """Dado un chat y el archivo del que se leyo, guarda su cache."""
+    vocabulario, autores, palabras, cadenas = chats_de_whatsapp.codificar_datos(chat.palabras_por_autor, chat.cadenas)
+
+    if sys.byteorder == 'big':
+        palabras.byteswap()
+        cadenas.byteswap()
+    secciones = [
+        '\n'.join(vocabulario).encode(),
+        '\n'.join(autores).encode(),
+        palabras.tobytes(),
+        cadenas.tobytes(),
+    ]
+    posiciones = []
+    posicion = ENCABEZADO.size
+    for seccion in secciones:
+        posiciones.extend((posicion, len(seccion)))
+        posicion += len(seccion)
+    datos = os.stat(archivo)
+    encabezado = ENCABEZADO.pack(FIRMA, VERSION, datos.st_size, datos.st_mtime_ns, huella(archivo, datos.st_size), *posiciones)
+    temporal = ruta_cache(archivo) + '.tmp'
+    with open(temporal, 'wb') as salida:
+        salida.write(encabezado)
+        for seccion in secciones:
+            salida.write(seccion)
+    os.replace(temporal, ruta_cache(archivo))
+
+
+class _LectorCache:
+    """Lee las secciones de una cache a medida que se piden."""
+
+    def __init__(self, ruta:str, posiciones:Tuple[int, ...]):
+        self.ruta = ruta
+        self.posiciones = posiciones
+        self._vocabulario = None
+        self._autores = None
+
+    def _seccion(self, numero:int) -> bytes:
+        posicion, largo = self.posiciones[2 * numero:2 * numero + 2]
+        with open(self.ruta, 'rb') as entrada:
+            entrada.seek(posicion)
+            return entrada.read(largo)
+
+    def _enteros(self, numero:int) -> array:
+        enteros = array('i')
+        enteros.frombytes(self._seccion(numero))
+        if sys.byteorder == 'big':
+            enteros.byteswap()
+        return enteros
+
+    def _nombres(self) -> Tuple[List[str], List[str]]:
+        if self._vocabulario is None:
+            vocabulario = self._seccion(0).decode()
+            self._vocabulario = vocabulario.split('\n') if vocabulario else []
+            self._autores = self._seccion(1).decode().split('\n')
+        return self._vocabulario, self._autores
+
+    def palabras_por_autor(self) -> Dict[str, Dict[str, int]]:
+        return chats_de_whatsapp.decodificar_palabras(*self._nombres(), self._enteros(2))
+
+    def cadenas(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        return chats_de_whatsapp.decodificar_cadenas(*self._nombres(), self._enteros(3))
+
+
+def abrir_cache(archivo:str) -> chats_de_whatsapp.Chat:
+    """Dado el archivo de un chat, devuelve el `Chat` guardado en su cache, o
+    None si no hay cache o si el chat cambio desde que se guardo. Solo se
+    lee el encabezado: los datos se leen la primera vez que se usan."""
+    ruta = ruta_cache(archivo)
+    try:
+        with open(ruta, 'rb') as entrada:
+            encabezado = entrada.read(ENCABEZADO.size)
+        datos = os.stat(archivo)
+    except FileNotFoundError:
+        return
+    if len(encabezado) < ENCABEZADO.size:
+        return
+    firma, version, tamanio, modificacion, huella_guardada, *posiciones = ENCABEZADO.unpack(encabezado)
+    if firma != FIRMA or version != VERSION:
+        return
+    if tamanio != datos.st_size or modificacion != datos.st_mtime_ns or huella_guardada != huella(archivo, tamanio):
+        return
+    lector = _LectorCache(ruta, tuple(posiciones))
+    return chats_de_whatsapp.Chat(lector.palabras_por_autor, lector.cadenas)
+
+
+def cargar_chat(archivo:str) -> chats_de_whatsapp.Chat:
+    """Dado el archivo de un chat, devuelve su `Chat` desde la cache si esta
+    al dia. Si no, procesa el chat (en paralelo si es grande) y guarda la
+    cache para la proxima vez."""
+    chat = abrir_cache(archivo)
+    if chat is not None:
+        return chat
+    if os.path.getsize(archivo) >= BYTES_EN_PARALELO and (os.cpu_count() or 1) > 1:
+        chat = chats_de_whatsapp.cargar_chat_en_paralelo(archivo)
+    else:
+        chat = chats_de_whatsapp.cargar_chat(archivo)
+    try:
+        guardar_cache(chat, archivo)
+    except OSError:
+        pass
+    return chat
+
+
+def main():
+    """Procesa un chat y guarda su cache, o la usa si ya esta al dia.
+    Uso: python cache_chat.py archivo"""
+    if len(sys.argv) != 2:
+        print(main.__doc__)
+        return
+    inicio = time.perf_counter()
+    chat = cargar_chat(sys.argv[1])
+    abierto = time.perf_counter() - inicio
+    autores = len(chat.palabras_por_autor)
+    cargado = time.perf_counter() - inicio
+    print(f'Chat abierto en {abierto:.3f} s, {autores} autores cargados en {cargado:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
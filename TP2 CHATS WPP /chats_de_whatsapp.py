@@ -1,5 +1,14 @@
-from typing import List, Dict
+from array import array
+from typing import List, Dict, Iterable, Tuple
+import io
+import multiprocessing
+import os
 import random
+import re
+
+# Encabezado de un mensaje: `dd/mm/aa hh:mm - Autor: mensaje`. El autor termina
+# en el primer ':' y puede tener guiones; el mensaje puede tener guiones y ':'.
+PATRON_MENSAJE = re.compile(r'(?P<fecha>\d{1,2}/\d{1,2}/\d{2,4}),? (?P<hora>\d{1,2}:\d{2}) - (?P<autor>[^:]+): ?(?P<mensaje>.*)')
 
 
 def contar_palabras(texto:str, archivo:str) -> Dict[str, Dict[str, int]]:
@@ -10,13 +19,12 @@ def contar_palabras(texto:str, archivo:str) -> Dict[str, Dict[str, int]]:
         return dic
     with open(archivo) as archivo:
         for linea in archivo:
-            datos = linea.rstrip('\n')
-            datos = datos_procesados(datos)
+            datos = leer_mensaje(linea)
             if not datos:
                 continue
-            autor, mensaje = datos
+            _, _, autor, mensaje = datos
             dic[autor] = dic.get(autor, {})
-            for palabra in mensaje:
+            for palabra in mensaje.lower().split():
                 if palabra in palabras_a_encontrar:
                     dic[autor][palabra] = dic[autor].get(palabra, 0) + 1
     for autor, palabras in dic.items():
@@ -25,8 +33,19 @@ def contar_palabras(texto:str, archivo:str) -> Dict[str, Dict[str, int]]:
     return dic
 
 
+def leer_mensaje(linea:str) -> Tuple[str, str, str, str]:
+    """Dada una linea de un archivo de chat, devuelve str(fecha), str(hora), str(autor) y str(mensaje) tal
+    como aparecen en la linea, o None si la linea no empieza un mensaje. Ver `PATRON_MENSAJE`."""
+    encabezado = PATRON_MENSAJE.match(linea)
+    if not encabezado:
+        return
+    return encabezado.groups()
+
+
 def datos_procesados(datos:str) -> str|List[str]:
-    """Dado una cadena, devuelve un str(autor) y una lista de str(mensaje)"""
+    """Dado una cadena, devuelve un str(autor) y una lista de str(mensaje).
+    Version anterior de `leer_mensaje`: cambia por espacios los guiones y ':' del mensaje y corta los
+    autores con guiones. Se conserva para comparar (ver medir_lectura.py)."""
     datos = datos.split('-')
     if len(datos) < 2:
         return
@@ -62,31 +81,279 @@ def cadenas_de_markov(archivo:str) -> Dict[str, Dict[str, Dict[str, int]]]:
     cadenas = {}
     with open(archivo) as archivo:
         for linea in archivo:
-            datos = linea.rstrip('\n')
-            datos = datos_procesados(datos)
+            datos = leer_mensaje(linea)
             if not datos:
                 continue
-            autor, palabras = datos
-            if " ".join(palabras) == '<multimedia omitido>' or len(palabras) < 3:
-                continue  
-            cadenas[autor] = cadenas.get(autor, {})
-            cadenas[autor]['comienzo de oracion'] = cadenas[autor].get('comienzo de oracion', {})
-            for i in range(1, len(palabras)):
-                anterior = palabras[i - 1]
-                actual = palabras[i]
-                if i == 1:
-                    cadenas[autor]['comienzo de oracion'][anterior] = cadenas[autor]['comienzo de oracion'].get(anterior, 0) + 1
-                    cadenas[autor][anterior] = cadenas[autor].get(anterior, {})
-                    cadenas[autor][anterior][actual] = cadenas[autor][anterior].get(actual, 0) + 1
-                elif i == len(palabras) - 1:
-                    cadenas[autor][actual] = cadenas[autor].get(actual, {})
-                    cadenas[autor][actual]['fin de oracion'] = cadenas[autor][actual].get('fin de oracion', 0) + 1
-                else:
-                    cadenas[autor][anterior] = cadenas[autor].get(anterior, {})
-                    cadenas[autor][anterior][actual] = cadenas[autor][anterior].get(actual, 0) + 1
+            _, _, autor, mensaje = datos
+            agregar_a_cadenas(cadenas, autor, mensaje.lower().split())
     return cadenas
 
 
+def agregar_a_cadenas(cadenas:Dict[str, Dict[str, Dict[str, int]]], autor:str, palabras:List[str]) -> None:
+    """Dadas las cadenas de Markov, un autor y las palabras de un mensaje suyo, suma las transiciones del mensaje a las cadenas."""
+    if " ".join(palabras) == '<multimedia omitido>' or len(palabras) < 3:
+        return
+    cadenas[autor] = cadenas.get(autor, {})
+    cadenas[autor]['comienzo de oracion'] = cadenas[autor].get('comienzo de oracion', {})
+    for i in range(1, len(palabras)):
+        anterior = palabras[i - 1]
+        actual = palabras[i]
+        if i == 1:
+            cadenas[autor]['comienzo de oracion'][anterior] = cadenas[autor]['comienzo de oracion'].get(anterior, 0) + 1
+            cadenas[autor][anterior] = cadenas[autor].get(anterior, {})
+            cadenas[autor][anterior][actual] = cadenas[autor][anterior].get(actual, 0) + 1
+        elif i == len(palabras) - 1:
+            cadenas[autor][actual] = cadenas[autor].get(actual, {})
+            cadenas[autor][actual]['fin de oracion'] = cadenas[autor][actual].get('fin de oracion', 0) + 1
+        else:
+            cadenas[autor][anterior] = cadenas[autor].get(anterior, {})
+            cadenas[autor][anterior][actual] = cadenas[autor][anterior].get(actual, 0) + 1
+
+
+class Chat:
+    """Datos de un chat procesados con una sola lectura del archivo, para
+    responder a `contar_palabras` y `cadenas_de_markov` sin volver a leerlo:
+    - `palabras_por_autor`: para cada autor, cuantas veces uso cada palabra,
+      en el orden en que aparecen por primera vez
+    - `cadenas`: las cadenas de Markov, iguales a las de `cadenas_de_markov`
+    - `indice`: para cada palabra, los autores que la usaron con la posicion
+      de la palabra en `palabras_por_autor[autor]` y su frecuencia. Se arma
+      la primera vez que se usa y permite contar palabras sin recorrer todo
+      el vocabulario
+    Si se reciben funciones para cargar alguno de los dos, se llaman recien la
+    primera vez que se usa (ver `cache_chat.py`)."""
+
+    def __init__(self, cargar_palabras=None, cargar_cadenas=None):
+        self._palabras_por_autor = {} if cargar_palabras is None else None
+        self._cadenas = {} if cargar_cadenas is None else None
+        self._cargar_palabras = cargar_palabras
+        self._cargar_cadenas = cargar_cadenas
+        self._indice = None
+
+    @property
+    def palabras_por_autor(self) -> Dict[str, Dict[str, int]]:
+        if self._palabras_por_autor is None:
+            self._palabras_por_autor = self._cargar_palabras()
+        return self._palabras_por_autor
+
+    @property
+    def cadenas(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        if self._cadenas is None:
+            self._cadenas = self._cargar_cadenas()
+        return self._cadenas
+
+    @property
+    def indice(self) -> Dict[str, Dict[str, Tuple[int, int]]]:
+        if self._indice is None:
+            self._indice = {}
+            for autor, conteo in self.palabras_por_autor.items():
+                for posicion, (palabra, frecuencia) in enumerate(conteo.items()):
+                    autores = self._indice.get(palabra)
+                    if autores is None:
+                        autores = self._indice[palabra] = {}
+                    autores[autor] = (posicion, frecuencia)
+        return self._indice
+
+    def agregar_mensaje(self, autor:str, palabras:List[str]) -> None:
+        """Dado un autor y las palabras de un mensaje suyo, suma el mensaje al chat."""
+        conteo = self.palabras_por_autor.get(autor)
+        if conteo is None:
+            conteo = self.palabras_por_autor[autor] = {}
+        for palabra in palabras:
+            conteo[palabra] = conteo.get(palabra, 0) + 1
+        agregar_a_cadenas(self.cadenas, autor, palabras)
+        self._indice = None
+
+    def unir(self, palabras_por_autor:Dict[str, Dict[str, int]], cadenas:Dict[str, Dict[str, Dict[str, int]]]) -> None:
+        """Dados los datos de la continuacion del chat (por ejemplo, de otro bloque del archivo), los suma
+        a los del chat."""
+        for autor, conteo in palabras_por_autor.items():
+            propio = self.palabras_por_autor.setdefault(autor, {})
+            for palabra, frecuencia in conteo.items():
+                propio[palabra] = propio.get(palabra, 0) + frecuencia
+        for autor, estados in cadenas.items():
+            propios = self.cadenas.setdefault(autor, {})
+            for estado, siguientes in estados.items():
+                propio = propios.setdefault(estado, {})
+                for siguiente, frecuencia in siguientes.items():
+                    propio[siguiente] = propio.get(siguiente, 0) + frecuencia
+        self._indice = None
+
+    def contar_palabras(self, texto:str) -> Dict[str, Dict[str, int]]:
+        """Dado un texto, devuelve lo mismo que `contar_palabras` para el archivo del chat. Usa el `indice`,
+        asi que solo mira las palabras del texto y no el resto del vocabulario."""
+        dic = {}
+        palabras_a_encontrar = set(texto.split())
+        if not palabras_a_encontrar:
+            return dic
+        encontradas = {autor: [] for autor in self.palabras_por_autor}
+        for palabra in palabras_a_encontrar:
+            for autor, (posicion, frecuencia) in self.indice.get(palabra, {}).items():
+                encontradas[autor].append((posicion, palabra, frecuencia))
+        for autor, palabras in encontradas.items():
+            # Las palabras encontradas van en el orden en que el autor las uso por primera vez.
+            palabras.sort()
+            dic[autor] = {palabra: frecuencia for _, palabra, frecuencia in palabras}
+            for palabra in palabras_a_encontrar:
+                dic[autor][palabra] = dic[autor].get(palabra, 0)
+        return dic
+
+
+# Datos de un chat codificados con enteros (ver `codificar_datos`): vocabulario, autores, palabras por autor y
+# cadenas de Markov.
+DatosCodificados = Tuple[List[str], List[str], array, array]
+
+# Estados de las cadenas de Markov que no son palabras, codificados fuera del vocabulario.
+COMIENZO = -1
+FIN = -2
+
+
+def codificar_datos(palabras_por_autor:Dict[str, Dict[str, int]], cadenas:Dict[str, Dict[str, Dict[str, int]]]) -> DatosCodificados:
+    """Dados los datos de un chat, devuelve el vocabulario y los autores en orden de aparicion, y las palabras
+    por autor y las cadenas como arreglos de enteros que nombran a las palabras y los autores por su posicion:
+    - palabras: por cada autor, la cantidad de palabras y los pares (palabra, frecuencia)
+    - cadenas: la cantidad de autores y, por cada uno, el autor, la cantidad de estados y por cada estado, el
+      estado, la cantidad de siguientes y los pares (siguiente, frecuencia). 'comienzo de oracion' y
+      'fin de oracion' se codifican como COMIENZO y FIN
+    Ocupa mucho menos que los diccionarios y se copia entre procesos o a un archivo sin recorrerlo."""
+    vocabulario = {}
+
+    def indice(palabra:str) -> int:
+        if palabra == 'comienzo de oracion':
+            return COMIENZO
+        if palabra == 'fin de oracion':
+            return FIN
+        if palabra not in vocabulario:
+            vocabulario[palabra] = len(vocabulario)
+        return vocabulario[palabra]
+
+    autores = {autor: i for i, autor in enumerate(palabras_por_autor)}
+    palabras = array('i')
+    for conteo in palabras_por_autor.values():
+        palabras.append(len(conteo))
+        for palabra, frecuencia in conteo.items():
+            palabras.extend((indice(palabra), frecuencia))
+    enteros_cadenas = array('i', [len(cadenas)])
+    for autor, estados in cadenas.items():
+        enteros_cadenas.extend((autores[autor], len(estados)))
+        for estado, siguientes in estados.items():
+            enteros_cadenas.extend((indice(estado), len(siguientes)))
+            for siguiente, frecuencia in siguientes.items():
+                enteros_cadenas.extend((indice(siguiente), frecuencia))
+    return list(vocabulario), list(autores), palabras, enteros_cadenas
+
+
+def decodificar_palabras(vocabulario:List[str], autores:List[str], enteros:array) -> Dict[str, Dict[str, int]]:
+    """Inversa de `codificar_datos` para las palabras por autor."""
+    palabras_por_autor = {}
+    i = 0
+    for autor in autores if enteros else []:
+        n = enteros[i]
+        conteo = palabras_por_autor[autor] = {}
+        for j in range(i + 1, i + 1 + 2 * n, 2):
+            conteo[vocabulario[enteros[j]]] = enteros[j + 1]
+        i += 1 + 2 * n
+    return palabras_por_autor
+
+
+def decodificar_cadenas(vocabulario:List[str], autores:List[str], enteros:array) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Inversa de `codificar_datos` para las cadenas de Markov."""
+    nombres = {COMIENZO: 'comienzo de oracion', FIN: 'fin de oracion'}
+    cadenas = {}
+    i = 1
+    for _ in range(enteros[0]):
+        autor, n_estados = enteros[i], enteros[i + 1]
+        i += 2
+        estados = cadenas[autores[autor]] = {}
+        for _ in range(n_estados):
+            estado, n_siguientes = enteros[i], enteros[i + 1]
+            i += 2
+            siguientes = estados[nombres.get(estado) or vocabulario[estado]] = {}
+            for j in range(i, i + 2 * n_siguientes, 2):
+                siguiente = enteros[j]
+                siguientes[nombres.get(siguiente) or vocabulario[siguiente]] = enteros[j + 1]
+            i += 2 * n_siguientes
+    return cadenas
+
+
+def cargar_chat(archivo:str) -> Chat:
+    """Dado un archivo, lo lee una sola vez y devuelve el `Chat` con sus datos."""
+    chat = Chat()
+    with open(archivo) as archivo:
+        agregar_lineas(chat, archivo)
+    return chat
+
+
+def agregar_lineas(chat:Chat, lineas:Iterable[str]) -> None:
+    """Dado un chat y lineas de un archivo de chat, suma al chat los mensajes de las lineas."""
+    for linea in lineas:
+        datos = leer_mensaje(linea)
+        if not datos:
+            continue
+        _, _, autor, mensaje = datos
+        chat.agregar_mensaje(autor, mensaje.lower().split())
+
+
+def dividir_en_bloques(archivo:str, cantidad:int) -> List[Tuple[int, int]]:
+    """Dado un archivo y una cantidad, lo divide en hasta esa cantidad de rangos de bytes (inicio, fin)
+    de tamaño parecido. Cada rango empieza al principio de una linea y termina al final de otra."""
+    tamanio = os.path.getsize(archivo)
+    limites = [0]
+    with open(archivo, 'rb') as entrada:
+        for i in range(1, cantidad):
+            posicion = tamanio * i // cantidad
+            if posicion <= limites[-1]:
+                continue
+            entrada.seek(posicion - 1)
+            entrada.readline()
+            limites.append(entrada.tell())
+    limites.append(tamanio)
+    return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if inicio < fin]
+
+
+def _procesar_bloque(bloque:Tuple[str, int, int]) -> DatosCodificados:
+    """Procesa un rango de bytes de un archivo de chat y devuelve sus datos codificados. Es la unidad de
+    trabajo de `cargar_chat_en_paralelo`."""
+    archivo, inicio, fin = bloque
+    with open(archivo, 'rb') as entrada:
+        entrada.seek(inicio)
+        datos = entrada.read(fin - inicio)
+    chat = Chat()
+    # Se decodifica igual que al abrir el archivo en modo texto.
+    agregar_lineas(chat, io.TextIOWrapper(io.BytesIO(datos)))
+    return codificar_datos(chat.palabras_por_autor, chat.cadenas)
+
+
+def _unir_bloques(par:Tuple[DatosCodificados, DatosCodificados]) -> DatosCodificados:
+    """Suma los datos codificados de dos bloques seguidos de un archivo de chat."""
+    primero, segundo = par
+    chat = Chat()
+    for vocabulario, autores, palabras, cadenas in (primero, segundo):
+        chat.unir(decodificar_palabras(vocabulario, autores, palabras), decodificar_cadenas(vocabulario, autores, cadenas))
+    return codificar_datos(chat.palabras_por_autor, chat.cadenas)
+
+
+def cargar_chat_en_paralelo(archivo:str, procesos:int=None, bloques_por_proceso:int=1) -> Chat:
+    """Dado un archivo, devuelve el mismo `Chat` que `cargar_chat`, procesando bloques del archivo en
+    varios procesos. Los resultados de los bloques vuelven codificados (ver `codificar_datos`) y se suman
+    de a pares, tambien en los procesos, siempre cada bloque con el siguiente: asi las palabras, autores y
+    transiciones quedan en el mismo orden que al leer el archivo de corrido. Solo la decodificacion del
+    resultado final queda a cargo del proceso principal."""
+    procesos = procesos or os.cpu_count()
+    bloques = [(archivo, inicio, fin) for inicio, fin in dividir_en_bloques(archivo, procesos * bloques_por_proceso)]
+    with multiprocessing.Pool(procesos) as pool:
+        resultados = pool.map(_procesar_bloque, bloques)
+        while len(resultados) > 1:
+            sobrante = resultados[-1:] if len(resultados) % 2 else []
+            resultados = pool.map(_unir_bloques, zip(resultados[0::2], resultados[1::2])) + sobrante
+    if not resultados:
+        return Chat()
+    vocabulario, autores, palabras, cadenas = resultados[0]
+    chat = Chat()
+    chat.unir(decodificar_palabras(vocabulario, autores, palabras), decodificar_cadenas(vocabulario, autores, cadenas))
+    return chat
+
+
 def contactos(cadenas:Dict[str, Dict[str, Dict[str, int]]]) -> List[str]:
     """Dado un diccionario de diccionarios de diccionarios, devuelve una lista con todos los contactos presentes en dicho diccionario"""
     contactos = []
@@ -1,3 +1,4 @@
+import cache_chat
 import chats_de_whatsapp
 from typing import List
 
@@ -99,6 +100,7 @@ def main():
     if not archivo:
         aviso()
         return
+    chat = cache_chat.cargar_chat(archivo)
     print()
     while True:
         menu_principal()
@@ -108,11 +110,11 @@ def main():
             destino = pedir_destino()
             if not destino:
                 continue
-            palabras_por_contacto = chats_de_whatsapp.contar_palabras(palabras, archivo)
+            palabras_por_contacto = chat.contar_palabras(palabras)
             chats_de_whatsapp.generar_reporte(palabras_por_contacto, destino)
             print()
         if opcion == 2:
-            cadenas = chats_de_whatsapp.cadenas_de_markov(archivo)
+            cadenas = chat.cadenas
             contacto_a_elegir = chats_de_whatsapp.contactos(cadenas)
             while True:
                 print()
@@ -127,4 +129,7 @@ def main():
             print()
             aviso()
             return
-main()
\ No newline at end of file
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import chats_de_whatsapp
+
+ARCHIVOS = ['friends.txt', 'shrek.txt', 'carroza.txt']
+
+
+def medir(funcion:Callable, lineas:List[str], repeticiones:int) -> float:
+    """Dada una funcion de lectura y las lineas de un chat, devuelve las lineas por segundo que procesa
+    (el mejor de `repeticiones` intentos)."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for linea in lineas:
+            funcion(linea)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return len(lineas) / mejor
+
+
+def autor_y_palabras(linea:str) -> Tuple[str, List[str]]:
+    """Lee una linea con `leer_mensaje` y devuelve lo mismo que `datos_procesados`: el autor y las palabras
+    del mensaje en minusculas."""
+    datos = chats_de_whatsapp.leer_mensaje(linea)
+    if not datos:
+        return
+    _, _, autor, mensaje = datos
+    return autor, mensaje.lower().split()
+
+
+def main():
+    """Compara las lineas por segundo de `datos_procesados` y `leer_mensaje` sobre los chats de ejemplo. La
+    columna `+ palabras` incluye pasar el mensaje a minusculas y separarlo en palabras, como hace
+    `datos_procesados`.
+    Uso: python medir_lectura.py [archivo ...]"""
+    archivos = sys.argv[1:] or ARCHIVOS
+    print(f"{'archivo':<14}{'lineas':>8}{'datos_procesados':>18}{'leer_mensaje':>14}{'+ palabras':>12}{'mejora':>8}{'distintas':>11}")
+    for archivo in archivos:
+        with open(archivo) as entrada:
+            lineas = list(entrada)
+        repeticiones = max(3, 200000 // len(lineas))
+        anterior = medir(lambda linea: chats_de_whatsapp.datos_procesados(linea.rstrip('\n')), lineas, repeticiones)
+        encabezado = medir(chats_de_whatsapp.leer_mensaje, lineas, repeticiones)
+        nueva = medir(autor_y_palabras, lineas, repeticiones)
+        distintas = sum(chats_de_whatsapp.datos_procesados(linea.rstrip('\n')) != autor_y_palabras(linea) for linea in lineas)
+        print(f'{archivo:<14}{len(lineas):>8}{anterior:>18,.0f}{encabezado:>14,.0f}{nueva:>12,.0f}{nueva / anterior:>7.2f}x{distintas:>11}')
+
+
+if __name__ == '__main__':
+    main()